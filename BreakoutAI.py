@@ -1,12 +1,12 @@
 import streamlit as st
-from streamlit_gsheets import GSheetsConnection
 from io import StringIO
 import pandas as pd
 import os
 from pathlib import Path
 from main import WebSearchPipeline
-from config.settings import GROQ_MODEL_LIST, GOOGLE_MODEL_LIST
+from config.settings import GROQ_MODEL_LIST, GOOGLE_MODEL_LIST, CASCADE_MODELS
 from agents.tools import SearchTools
+from agents.agent_pool import AgentPool
 
 def initialize_session_state():
     if 'df' not in st.session_state:
@@ -28,6 +28,8 @@ def handle_file_upload():
 def handle_gsheet_connection(sheet_url):
     if sheet_url.startswith("https://"):
         try:
+            from streamlit_gsheets import GSheetsConnection
+
             os.makedirs(".streamlit", exist_ok=True)
             with open(".streamlit/secrets.toml", "w") as f:
                 f.write(f'[connections.gsheets]\nspreadsheet = "{sheet_url}"')
@@ -40,6 +42,11 @@ def handle_gsheet_connection(sheet_url):
         except Exception as e:
             st.error(f"Error connecting to Google Sheets: {e}")
 
+@st.cache_resource
+def get_agent_pool() -> AgentPool:
+    """Warm LLM clients and agents kept across reruns and sessions."""
+    return AgentPool()
+
 def main():
     st.title("Web Search Pipeline")
     initialize_session_state()
@@ -81,17 +88,30 @@ def main():
     
     model_source = st.sidebar.selectbox("Select Model Source", ["groq", "google"])
     model_list = GROQ_MODEL_LIST if model_source == "groq" else GOOGLE_MODEL_LIST
+    # The cascade tries a small model first and escalates only when its answer is unusable
+    model_list = [name for name in CASCADE_MODELS if name.startswith(model_source)] + model_list
     selected_model = st.sidebar.selectbox("Select Model", model_list)
 
     num_rows = st.sidebar.number_input("Number of rows to process", min_value=1, step=1, value=1)
+    max_concurrency = st.sidebar.number_input("Concurrent searches", min_value=1, max_value=32, step=1, value=1)
+    refresh_cache = st.sidebar.checkbox("Refresh cached search results", value=False)
+    llm_cache = st.sidebar.checkbox("Reuse cached LLM responses", value=False)
+    direct_mode = st.sidebar.checkbox(
+        "Fast mode (one search + one extraction per row)", value=False,
+        help="Falls back to the full agent when the answer is not in the search results"
+    )
+    batch_size = st.sidebar.number_input(
+        "Rows per extraction call", min_value=1, max_value=20, step=1, value=1
+    ) if direct_mode else 1
 
     # Tools Selection
     st.sidebar.subheader("Available Tools")
-    tools = SearchTools.get_tool_list()
-    tool_names = [tool.name for tool in tools]
+    tool_names = [tool["name"] for tool in SearchTools.list_tool_metadata()]
     selected_tool = st.sidebar.selectbox("Select Tools to Use", tool_names)
-
-    tool_index = next((i for i, tool in enumerate(tools) if tool.name == selected_tool), 0)
+    local_knowledge = st.sidebar.checkbox(
+        "Check earlier search results first", value=False,
+        help="Adds the Local Knowledge tool so the agent can answer from stored results before searching the web"
+    )
 
     # Main Content Area
     if st.session_state.df is not None:
@@ -110,16 +130,26 @@ def main():
         if st.button("Start Processing"):
             with st.spinner("Processing... Please wait."):
                 try:
-                    pipeline = WebSearchPipeline(
-                        data_source=st.session_state.df,
-                        query_template=query_template,
-                        model_name=selected_model,
-                        output_path="search_results.csv",
-                        rate_limit=1.0,
-                        num_rows=num_rows,
-                        tools=[tools[tool_index]],
-                    )
-                    results_df, results = pipeline.run()
+                    tools = [SearchTools.get_tool(selected_tool)]
+                    if local_knowledge:
+                        tools = SearchTools.with_local_knowledge(tools)
+                    with get_agent_pool().checkout(selected_model, tools, llm_cache=llm_cache) as lease:
+                        pipeline = WebSearchPipeline(
+                            data_source=st.session_state.df,
+                            query_template=query_template,
+                            model_name=selected_model,
+                            output_path="search_results.csv",
+                            num_rows=num_rows,
+                            tools=tools,
+                            max_concurrency=max_concurrency,
+                            cache_mode="refresh" if refresh_cache else "use",
+                            llm_cache=llm_cache,
+                            mode="direct" if direct_mode else "agent",
+                            batch_size=batch_size,
+                            llm=lease.llm,
+                            agent=lease.agent,
+                        )
+                        results_df, results = pipeline.run()
                     
                     # Store results in session state
                     st.session_state.results_df = results_df
@@ -0,0 +1,184 @@
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+from agents.search_agent import SearchAgent
+from config.settings import AGENT_POOL_IDLE_TTL, AGENT_POOL_MAX_IDLE, DEFAULT_TEMPERATURE
+from models.llm import LLMFactory
+
+
+class AgentLease:
+    """
+    Exclusive use of a pooled agent and its LLM client.
+
+    Release it when the run is over, or use it as a context manager.
+    """
+
+    def __init__(self, pool: "AgentPool", key: Tuple, llm_key: Tuple, llm: Any, agent: SearchAgent):
+        self.pool = pool
+        self.key = key
+        self.llm_key = llm_key
+        self.llm = llm
+        self.agent = agent
+        self.released = False
+
+    def release(self) -> None:
+        """Return the agent to the pool; later calls do nothing."""
+        if not self.released:
+            self.released = True
+            self.pool._release(self)
+
+    def __enter__(self) -> "AgentLease":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+class AgentPool:
+    """
+    Warm pool of LLM clients and SearchAgents reused across pipeline runs.
+
+    LLM clients are safe to call from several threads, so one client is
+    shared per (model, temperature, cache) key. Agents are checked out for
+    the length of a run, so two runs never share one; a run that finds no
+    idle agent for its key gets a new one. Agents and clients unused for
+    ``idle_ttl`` seconds are dropped.
+    """
+
+    def __init__(self, idle_ttl: float = AGENT_POOL_IDLE_TTL, max_idle: int = AGENT_POOL_MAX_IDLE):
+        self.idle_ttl = idle_ttl
+        self.max_idle = max_idle
+        self.lock = threading.Lock()
+        self.idle: Dict[Tuple, List[Tuple[SearchAgent, float]]] = {}
+        self.llms: Dict[Tuple, Tuple[Any, float]] = {}
+        self.leased: Dict[Tuple, int] = {}  # Leases out per LLM key
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def agent_key(
+        model_name: str,
+        tools: List,
+        temperature: float = DEFAULT_TEMPERATURE,
+        llm_cache: bool = False,
+        **agent_options: Any,
+    ) -> Tuple:
+        """Return the pool key of an agent configuration."""
+        return (
+            model_name,
+            temperature,
+            llm_cache,
+            tuple((tool.name, id(tool)) for tool in tools),
+            tuple(sorted(agent_options.items())),
+        )
+
+    def checkout(
+        self,
+        model_name: str,
+        tools: List,
+        temperature: float = DEFAULT_TEMPERATURE,
+        llm_cache: bool = False,
+        **agent_options: Any,
+    ) -> AgentLease:
+        """
+        Check out an agent for a run, building it only if none is idle.
+
+        Args:
+            model_name: Name of the model to use
+            tools: Tools the agent may call
+            temperature: Temperature parameter for the model
+            llm_cache: Whether to serve identical calls from the persistent LLM cache
+            **agent_options: SearchAgent budgets such as max_iterations
+
+        Returns:
+            AgentLease: The leased LLM client and agent
+        """
+        key = AgentPool.agent_key(model_name, tools, temperature, llm_cache, **agent_options)
+        llm_key = (model_name, temperature, llm_cache)
+        now = time.monotonic()
+        with self.lock:
+            self._evict(now)
+            llm = self.llms.get(llm_key, (None, 0))[0]
+            if llm is None:
+                llm = LLMFactory.create_llm(model_name, temperature, cache=llm_cache)
+            self.llms[llm_key] = (llm, now)
+            self.leased[llm_key] = self.leased.get(llm_key, 0) + 1
+
+            idle = self.idle.get(key)
+            agent = idle.pop()[0] if idle else None
+            if agent is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if agent is None:
+            # Built outside the lock so other checkouts are not held up
+            agent = SearchAgent(llm, tools, **agent_options)
+        return AgentLease(self, key, llm_key, llm, agent)
+
+    def _release(self, lease: AgentLease) -> None:
+        now = time.monotonic()
+        with self.lock:
+            self.leased[lease.llm_key] -= 1
+            if lease.llm_key in self.llms:
+                self.llms[lease.llm_key] = (lease.llm, now)
+            idle = self.idle.setdefault(lease.key, [])
+            if len(idle) < self.max_idle:
+                idle.append((lease.agent, now))
+            self._evict(now)
+
+    def _evict(self, now: float) -> int:
+        """Drop idle agents and unused clients past the TTL. Caller holds the lock."""
+        evicted = 0
+        for key in list(self.idle):
+            kept = [(agent, used) for agent, used in self.idle[key] if now - used <= self.idle_ttl]
+            evicted += len(self.idle[key]) - len(kept)
+            if kept:
+                self.idle[key] = kept
+            else:
+                del self.idle[key]
+        for llm_key, (_, used) in list(self.llms.items()):
+            if not self.leased.get(llm_key) and now - used > self.idle_ttl:
+                del self.llms[llm_key]
+                self.leased.pop(llm_key, None)
+                evicted += 1
+                # Idle agents built on the dropped client go with it
+                for key in [key for key in self.idle if key[:3] == llm_key]:
+                    evicted += len(self.idle.pop(key))
+        return evicted
+
+    def evict_idle(self) -> int:
+        """
+        Drop idle agents and clients past the TTL now.
+
+        Returns:
+            int: Number of agents and clients dropped
+        """
+        with self.lock:
+            return self._evict(time.monotonic())
+
+    def warm(self, model_name: str, tools: List, count: int = 1, **options: Any) -> None:
+        """
+        Build agents ahead of the first run.
+
+        Args:
+            model_name: Name of the model to use
+            tools: Tools the agents may call
+            count: Number of idle agents to have ready
+            **options: Same as ``checkout``
+        """
+        leases = [self.checkout(model_name, tools, **options) for _ in range(count)]
+        for lease in leases:
+            lease.release()
+
+    def stats(self) -> Dict[str, int]:
+        """Return pool hit/miss counts and sizes."""
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "idle_agents": sum(len(idle) for idle in self.idle.values()),
+                "leased_agents": sum(self.leased.values()),
+                "llm_clients": len(self.llms),
+            }
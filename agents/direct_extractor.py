@@ -0,0 +1,141 @@
+import json
+from langchain_core.agents import AgentAction
+from langchain_core.prompts import PromptTemplate
+from typing import Dict, Any, List, Optional
+
+NOT_FOUND = "NOT_FOUND"
+
+
+class ExtractionError(Exception):
+    """Raised when the search results do not answer the query."""
+
+
+class DirectExtractor:
+    """
+    Fixed two-step plan for a row: one tool call with the rendered query,
+    then one LLM call that extracts the answer from the observation.
+
+    Returns results shaped like ``SearchAgent.search`` so the pipeline can
+    treat both the same way.
+    """
+
+    def __init__(self, llm, tool):
+        self.llm = llm
+        self.tool = tool
+        self.prompt = self._create_prompt()
+        self.batch_prompt = self._create_batch_prompt()
+
+    def _create_prompt(self) -> PromptTemplate:
+        """Create the extraction prompt."""
+        template = '''Answer the question using only the search results below.
+        Give the answer directly, without describing the search.
+        If the search results do not contain the answer, reply with exactly {not_found}.
+        Search results:
+        {observation}
+        Question: {input}
+        Answer:'''
+
+        return PromptTemplate.from_template(template).partial(not_found=NOT_FOUND)
+
+    def _create_batch_prompt(self) -> PromptTemplate:
+        """Create the prompt that extracts answers for several rows at once."""
+        template = '''Answer each question using only the search results given for it.
+        Reply with a JSON object that maps every question id to its answer as a string, and nothing else.
+        If the search results for a question do not contain the answer, use {not_found} as its answer.
+        {items}
+        JSON:'''
+
+        return PromptTemplate.from_template(template).partial(not_found=NOT_FOUND)
+
+    @staticmethod
+    def parse_keyed_answers(text: str) -> Dict[str, Any]:
+        """
+        Parse the JSON object in a batched extraction reply.
+
+        Args:
+            text: Model reply, possibly wrapped in a code fence or prose
+
+        Returns:
+            Dict[str, Any]: Answers keyed by question id (empty if unparseable)
+        """
+        start, end = text.find("{"), text.rfind("}")
+        if start == -1 or end <= start:
+            return {}
+        try:
+            answers = json.loads(text[start:end + 1])
+        except json.JSONDecodeError:
+            return {}
+        return answers if isinstance(answers, dict) else {}
+
+    def _result(self, query: str, observation: Any, answer: str, mode: str) -> Dict[str, Any]:
+        """Build a result shaped like the agent's."""
+        action = AgentAction(tool=self.tool.name, tool_input=query, log="Direct search")
+        return {
+            "input": query,
+            "output": answer,
+            "intermediate_steps": [(action, observation)],
+            "mode": mode,
+        }
+
+    def search(self, query: str, callbacks: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """
+        Search once and extract the answer.
+
+        Args:
+            query: Search query string
+            callbacks: Callback handlers for the tool and LLM calls
+
+        Returns:
+            Dict containing the answer and the single intermediate step
+
+        Raises:
+            ExtractionError: If the observation is empty or does not answer the query
+        """
+        config = {"callbacks": callbacks}
+        observation = self.tool.invoke(query, config=config)
+        if not str(observation).strip():
+            raise ExtractionError("search returned no results")
+
+        message = self.llm.invoke(self.prompt.format(observation=observation, input=query), config=config)
+        answer = str(getattr(message, "content", message)).strip()
+        if not answer or NOT_FOUND in answer:
+            raise ExtractionError("search results do not answer the query")
+
+        return self._result(query, observation, answer, "direct")
+
+    def search_batch(self, queries: List[str], callbacks: Optional[List[Any]] = None) -> List[Optional[Dict[str, Any]]]:
+        """
+        Search every query, then extract all answers with one LLM call.
+
+        Args:
+            queries: Search query strings
+            callbacks: Callback handlers for the tool and LLM calls
+
+        Returns:
+            List[Optional[Dict[str, Any]]]: One result per query, in order; None
+            where the search failed or the reply has no usable answer, so the
+            caller can retry that row on its own
+        """
+        # Tool calls run concurrently; failures come back as exception objects
+        config = {"callbacks": callbacks}
+        observations = self.tool.batch(queries, config=config, return_exceptions=True)
+
+        items = []
+        for k, (query, observation) in enumerate(zip(queries, observations), 1):
+            if isinstance(observation, Exception) or not str(observation).strip():
+                continue
+            items.append(f"Question q{k}: {query}\nSearch results for q{k}:\n{observation}\n")
+        if not items:
+            return [None] * len(queries)
+
+        message = self.llm.invoke(self.batch_prompt.format(items="\n".join(items)), config=config)
+        answers = DirectExtractor.parse_keyed_answers(str(getattr(message, "content", message)))
+
+        results = []
+        for k, (query, observation) in enumerate(zip(queries, observations), 1):
+            answer = str(answers.get(f"q{k}", "")).strip()
+            if not answer or NOT_FOUND in answer:
+                results.append(None)
+            else:
+                results.append(self._result(query, observation, answer, "batch"))
+        return results
@@ -0,0 +1,234 @@
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextvars import copy_context
+from functools import wraps
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from config.settings import (
+    HEDGE_DEFAULT_DELAY,
+    HEDGE_MAX_DELAY,
+    HEDGE_MAX_WORKERS,
+    HEDGE_MIN_DELAY,
+    HEDGE_MIN_SAMPLES,
+    HEDGE_QUANTILE,
+    HEDGE_WINDOW,
+)
+from utils.cache import ToolCache
+from utils.metrics import MetricsCallbackHandler, MetricsRecorder
+
+# What the search wrappers return instead of raising when nothing matched
+_NO_RESULT = re.compile(r"^\s*No good .*results? (was )?found", re.I)
+
+
+class LatencyTracker:
+    """Recent call latencies per search backend, shared by all hedged searches."""
+
+    def __init__(self, window: int = HEDGE_WINDOW):
+        self.window = window
+        self.lock = threading.Lock()
+        self.latencies: Dict[str, Deque[float]] = {}
+        self.failures: Dict[str, int] = {}
+
+    def record(self, backend: str, seconds: float, ok: bool = True) -> None:
+        """Record the latency of a finished call."""
+        with self.lock:
+            self.latencies.setdefault(backend, deque(maxlen=self.window)).append(seconds)
+            if not ok:
+                self.failures[backend] = self.failures.get(backend, 0) + 1
+
+    def wrap(self, backend: str, func: Callable[[str], Any]) -> Callable[[str], Any]:
+        """
+        Wrap a backend's tool function so each call's latency is recorded.
+
+        Wrap the real backend call, below the tool cache, so cache hits do
+        not pull the threshold down.
+
+        Args:
+            backend: Backend tool name
+            func: Tool function taking the query string
+
+        Returns:
+            Callable: Timed tool function
+        """
+        @wraps(func)
+        def timed(query: str, *args, **kwargs):
+            start = time.monotonic()
+            try:
+                result = func(query, *args, **kwargs)
+            except Exception:
+                self.record(backend, time.monotonic() - start, ok=False)
+                raise
+            self.record(backend, time.monotonic() - start, ok=HedgedSearch._is_good(result))
+            return result
+
+        return timed
+
+    def threshold(self, backend: str) -> float:
+        """
+        Return how long to wait for a backend before hedging.
+
+        Args:
+            backend: Backend tool name
+
+        Returns:
+            float: The HEDGE_QUANTILE latency of recent calls, clamped to
+            [HEDGE_MIN_DELAY, HEDGE_MAX_DELAY]; HEDGE_DEFAULT_DELAY until
+            HEDGE_MIN_SAMPLES calls have been observed
+        """
+        with self.lock:
+            values = sorted(self.latencies.get(backend, ()))
+        if len(values) < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_DELAY
+        return min(HEDGE_MAX_DELAY, max(HEDGE_MIN_DELAY, MetricsRecorder.percentile(values, HEDGE_QUANTILE)))
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return call counts, failures and latency percentiles per backend."""
+        with self.lock:
+            snapshot = {backend: sorted(values) for backend, values in self.latencies.items()}
+            failures = dict(self.failures)
+        return {
+            backend: {
+                "calls": len(values),
+                "failures": failures.get(backend, 0),
+                "p50": round(MetricsRecorder.percentile(values, 0.5), 4),
+                "p95": round(MetricsRecorder.percentile(values, 0.95), 4),
+                "threshold": round(self.threshold(backend), 4),
+            }
+            for backend, values in snapshot.items()
+        }
+
+
+class HedgedSearch:
+    """
+    Search with a primary backend and hedge with a secondary one.
+
+    The query goes to the primary tool first. If it has not answered within
+    its adaptive latency threshold, or it fails, the secondary tool is asked
+    too and the first good result wins. With ``merge`` the other result is
+    also used if it arrives within one more threshold, and the snippets of
+    both are merged without duplicates.
+
+    Thresholds come from ``tracker``, which only sees backend calls wrapped
+    with ``tracker.wrap``; until a backend has samples HEDGE_DEFAULT_DELAY
+    is used. Slow calls are not interrupted; they finish in the background
+    so their latency still feeds the tracker.
+    """
+
+    tracker = LatencyTracker()
+    _executor = ThreadPoolExecutor(max_workers=HEDGE_MAX_WORKERS, thread_name_prefix="hedge")
+
+    def __init__(self, primary, secondary, merge: bool = False):
+        self.primary = primary
+        self.secondary = secondary
+        self.merge = merge
+
+    def _submit(self, tool, query: str) -> Future:
+        # Copy the context so the cache mode and metrics reach the backend call
+        return HedgedSearch._executor.submit(copy_context().run, tool.invoke, query)
+
+    @staticmethod
+    def _is_good(result: Any) -> bool:
+        """Whether a result has content, rather than a no-result note or an error string."""
+        if not result or not str(result).strip():
+            return False
+        if isinstance(result, str) and (_NO_RESULT.match(result) or ToolCache.is_error_result(result)):
+            return False
+        return True
+
+    @staticmethod
+    def _outcome(future: Future) -> Tuple[bool, Any]:
+        """Return (good, result or exception) of a finished call."""
+        try:
+            result = future.result()
+        except Exception as e:
+            return False, e
+        return HedgedSearch._is_good(result), result
+
+    @staticmethod
+    def _snippets(result: Any) -> List[str]:
+        if isinstance(result, list):
+            return [str(item) for item in result]
+        return [line for line in str(result).splitlines() if line.strip()]
+
+    @staticmethod
+    def merge_results(first: Any, second: Any) -> str:
+        """
+        Merge two search results, dropping snippets that appear in both.
+
+        Args:
+            first: Result whose snippets come first
+            second: Result whose new snippets are appended
+
+        Returns:
+            str: One snippet per line
+        """
+        seen = set()
+        merged = []
+        for snippet in HedgedSearch._snippets(first) + HedgedSearch._snippets(second):
+            key = re.sub(r"\s+", " ", snippet).strip().lower()
+            if key not in seen:
+                seen.add(key)
+                merged.append(snippet)
+        return "\n".join(merged)
+
+    @staticmethod
+    def _count(outcome: str) -> None:
+        handler = MetricsCallbackHandler.current()
+        recorder = handler.recorder if handler is not None else MetricsRecorder.shared()
+        recorder.increment("hedged_searches_total", outcome=outcome)
+
+    def run(self, query: str) -> Any:
+        """
+        Search for a query, hedging slow or failed primary calls.
+
+        Args:
+            query: The search query
+
+        Returns:
+            Any: The first good result, or the merged results
+
+        Raises:
+            Exception: The primary's error if neither backend returned a result
+        """
+        threshold = HedgedSearch.tracker.threshold(self.primary.name)
+        primary = self._submit(self.primary, query)
+        done, _ = wait([primary], timeout=threshold)
+        if primary in done:
+            good, result = HedgedSearch._outcome(primary)
+            if good:
+                HedgedSearch._count("primary")
+                return result
+
+        secondary = self._submit(self.secondary, query)
+        pending = {primary, secondary}
+        winner: Optional[Future] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if HedgedSearch._outcome(future)[0]:
+                    winner = future
+                    break
+            if winner is not None:
+                break
+
+        if winner is None:
+            HedgedSearch._count("failed")
+            _, result = HedgedSearch._outcome(primary)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        result = winner.result()
+        other = secondary if winner is primary else primary
+        if self.merge:
+            wait([other], timeout=threshold)
+            if other.done() and HedgedSearch._outcome(other)[0]:
+                HedgedSearch._count("merged")
+                first, second = (result, other.result()) if winner is primary else (other.result(), result)
+                return HedgedSearch.merge_results(first, second)
+
+        HedgedSearch._count("primary" if winner is primary else "secondary")
+        return result
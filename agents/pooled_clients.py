@@ -0,0 +1,97 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_community.tools.tavily_search import TavilySearchResults
+from langchain_community.utilities import GoogleSerperAPIWrapper, SerpAPIWrapper
+from langchain_community.utilities.tavily_search import TAVILY_API_URL, TavilySearchAPIWrapper
+
+from utils.http import HttpSessions
+
+
+class PooledSerpAPIWrapper(SerpAPIWrapper):
+    """SerpAPIWrapper that sends requests through the pooled 'serpapi' session."""
+
+    def results(self, query: str) -> dict:
+        params = self.get_params(query)
+        params["source"] = "python"
+        params["output"] = "json"
+        response = HttpSessions.get("serpapi").get(
+            "https://serpapi.com/search", params=params, timeout=HttpSessions.timeout()
+        )
+        return response.json()
+
+
+class PooledGoogleSerperAPIWrapper(GoogleSerperAPIWrapper):
+    """GoogleSerperAPIWrapper that sends requests through the pooled 'serper' session."""
+
+    def _google_serper_api_results(
+        self, search_term: str, search_type: str = "search", **kwargs: Any
+    ) -> dict:
+        headers = {
+            "X-API-KEY": self.serper_api_key or "",
+            "Content-Type": "application/json",
+        }
+        params = {
+            "q": search_term,
+            **{key: value for key, value in kwargs.items() if value is not None},
+        }
+        response = HttpSessions.get("serper").post(
+            f"https://google.serper.dev/{search_type}",
+            headers=headers,
+            params=params,
+            timeout=HttpSessions.timeout(),
+        )
+        response.raise_for_status()
+        return response.json()
+
+
+class PooledTavilySearchAPIWrapper(TavilySearchAPIWrapper):
+    """TavilySearchAPIWrapper that sends requests through the pooled 'tavily' session."""
+
+    def raw_results(
+        self,
+        query: str,
+        max_results: Optional[int] = 5,
+        search_depth: Optional[str] = "advanced",
+        include_domains: Optional[List[str]] = [],
+        exclude_domains: Optional[List[str]] = [],
+        include_answer: Optional[bool] = False,
+        include_raw_content: Optional[bool] = False,
+        include_images: Optional[bool] = False,
+    ) -> Dict:
+        params = {
+            "api_key": self.tavily_api_key.get_secret_value(),
+            "query": query,
+            "max_results": max_results,
+            "search_depth": search_depth,
+            "include_domains": include_domains,
+            "exclude_domains": exclude_domains,
+            "include_answer": include_answer,
+            "include_raw_content": include_raw_content,
+            "include_images": include_images,
+        }
+        response = HttpSessions.get("tavily").post(
+            f"{TAVILY_API_URL}/search", json=params, timeout=HttpSessions.timeout()
+        )
+        response.raise_for_status()
+        return response.json()
+
+
+class PooledTavilySearchResults(TavilySearchResults):
+    """
+    TavilySearchResults that raises API errors. The base tool returns
+    ``repr(e)`` as the result instead, which would then be cached and
+    indexed as if it were a search result.
+    """
+
+    def _run(self, query: str, run_manager: Any = None) -> Tuple[Any, Dict]:
+        raw_results = self.api_wrapper.raw_results(
+            query,
+            self.max_results,
+            self.search_depth,
+            self.include_domains,
+            self.exclude_domains,
+            self.include_answer,
+            self.include_raw_content,
+            self.include_images,
+        )
+        return self.api_wrapper.clean_results(raw_results["results"]), raw_results
@@ -1,16 +1,37 @@
 from langchain.agents import create_react_agent, AgentExecutor
 from langchain.memory import ConversationBufferMemory
+from langchain_core.agents import AgentAction
 from langchain_core.messages import SystemMessage
 from langchain_core.prompts import PromptTemplate
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+from config.settings import (
+    AGENT_MAX_ITERATIONS,
+    AGENT_MAX_EXECUTION_TIME,
+    AGENT_MAX_SCRATCHPAD_TOKENS,
+    AGENT_COMPACTED_OBSERVATION_CHARS,
+)
+
+# Output AgentExecutor returns when it stops on max_iterations or max_execution_time
+STOPPED_OUTPUT_PREFIX = "Agent stopped due to"
 
 class SearchAgent:
-    def __init__(self, llm, tools):
+    def __init__(
+        self,
+        llm,
+        tools,
+        max_iterations: Optional[int] = AGENT_MAX_ITERATIONS,
+        max_execution_time: Optional[float] = AGENT_MAX_EXECUTION_TIME,
+        max_scratchpad_tokens: Optional[int] = AGENT_MAX_SCRATCHPAD_TOKENS,
+    ):
         self.llm = llm
         self.tools = tools
+        self.max_iterations = max_iterations
+        self.max_execution_time = max_execution_time
+        self.max_scratchpad_tokens = max_scratchpad_tokens
         self.memory = self._initialize_memory()
         self.agent = self._create_agent()
         self.executor = self._create_executor()
+        self.partial_answer_prompt = self._create_partial_answer_prompt()
 
     def _initialize_memory(self) -> ConversationBufferMemory:
         """Initialize conversation memory with system message."""
@@ -48,17 +69,114 @@ class SearchAgent:
             tools=self.tools,
             verbose=True,
             return_intermediate_steps=True,
+            max_iterations=self.max_iterations,
+            max_execution_time=self.max_execution_time,
+            trim_intermediate_steps=self.compact_steps,
             # memory=self.memory
         )
 
-    def search(self, query: str) -> Dict[str, Any]:
+    def _create_partial_answer_prompt(self) -> PromptTemplate:
+        """Create the prompt used to answer from the steps of a stopped run."""
+        template = '''You ran out of time while researching the question below.
+        Using only the information gathered so far, give the best final answer you can.
+        Say which parts could not be found.
+        Information gathered:
+        {observations}
+        Question: {input}
+        Final Answer:'''
+
+        return PromptTemplate.from_template(template)
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        # About four characters per token
+        return len(text) // 4
+
+    @staticmethod
+    def _compact_observation(observation: Any, max_chars: int) -> str:
+        text = str(observation)
+        if len(text) <= max_chars:
+            return text
+        # The note counts toward max_chars; the full length bounds its digits
+        keep = max(0, max_chars - len(f"... [{len(text)} characters omitted]"))
+        return text[:keep] + f"... [{len(text) - keep} characters omitted]"
+
+    def compact_steps(self, steps: List[Tuple[AgentAction, Any]]) -> List[Tuple[AgentAction, Any]]:
+        """
+        Keep the scratchpad the agent re-sends within the token budget.
+
+        Observations are compacted from the oldest on, so the latest ones stay
+        intact for as long as possible. If compacting every observation is not
+        enough, observations are truncated evenly to fit. The steps returned by
+        the executor are not changed; only the scratchpad is.
+
+        Args:
+            steps: Intermediate (action, observation) steps so far
+
+        Returns:
+            List of steps to render into the scratchpad
+        """
+        if not self.max_scratchpad_tokens:
+            return steps
+
+        total = sum(self._estimate_tokens(action.log) + self._estimate_tokens(str(observation))
+                    for action, observation in steps)
+        if total <= self.max_scratchpad_tokens:
+            return steps
+
+        compacted = list(steps)
+        for k, (action, observation) in enumerate(steps):
+            if total <= self.max_scratchpad_tokens:
+                break
+            short = self._compact_observation(observation, AGENT_COMPACTED_OBSERVATION_CHARS)
+            total += self._estimate_tokens(short) - self._estimate_tokens(str(observation))
+            compacted[k] = (action, short)
+
+        if total > self.max_scratchpad_tokens:
+            logs = sum(self._estimate_tokens(action.log) for action, _ in steps)
+            per_step = max(0, (self.max_scratchpad_tokens - logs) * 4 // len(steps))
+            compacted = [(action, self._compact_observation(observation, per_step))
+                         for action, observation in steps]
+        return compacted
+
+    def _best_partial_answer(
+        self, query: str, result: Dict[str, Any], callbacks: Optional[List[Any]] = None
+    ) -> Dict[str, Any]:
+        """Answer from the steps gathered before the agent was stopped."""
+        steps = self.compact_steps(result.get("intermediate_steps", []))
+        observations = "\n".join(
+            f"- {action.tool}({action.tool_input}): {observation}" for action, observation in steps
+        )
+        partial = dict(result, stopped_early=True)
+        if not observations:
+            return partial
+
+        try:
+            message = self.llm.invoke(
+                self.partial_answer_prompt.format(observations=observations, input=query),
+                config={"callbacks": callbacks},
+            )
+            partial["output"] = str(getattr(message, "content", message)).strip() or result["output"]
+        except Exception as e:
+            print(f"Could not build a partial answer: {e}")
+        return partial
+
+    def search(self, query: str, callbacks: Optional[List[Any]] = None) -> Dict[str, Any]:
         """
         Execute a search query using the agent.
         
+        If the agent runs out of iterations or time, the best answer from the
+        steps gathered so far is returned and ``stopped_early`` is set.
+
         Args:
             query: Search query string
+            callbacks: Callback handlers for this search, e.g. a MetricsCallbackHandler
             
         Returns:
             Dict containing search results and intermediate steps
         """
-        return self.executor.invoke({"input": query})
\ No newline at end of file
+        result = self.executor.invoke({"input": query}, config={"callbacks": callbacks})
+        if str(result.get("output", "")).startswith(STOPPED_OUTPUT_PREFIX):
+            print(f"Agent budget reached for '{query}'; answering from partial results")
+            result = self._best_partial_answer(query, result, callbacks)
+        return result
@@ -1,19 +1,65 @@
-from langchain.tools import tool, Tool
-from langchain_community.utilities import SerpAPIWrapper, DuckDuckGoSearchAPIWrapper, GoogleSerperAPIWrapper
-from langchain_community.utilities import WikipediaAPIWrapper
-from langchain_community.tools.tavily_search import TavilySearchResults
-from langchain.tools import tool
-from tavily import TavilyClient
-from typing import Dict, Any,List
+from langchain_core.tools import tool, Tool
+from typing import Dict, Any,List, Optional
+import threading
+from utils.rate_limiter import RateLimiter
+from utils.cache import ToolCache
+from utils.http import HttpSessions
+from utils.observation_compressor import ObservationCompressor
+from utils.knowledge_index import KnowledgeIndex
+from agents.hedged_search import HedgedSearch
+from config.settings import HEDGE_PRIMARY_TOOL, HEDGE_SECONDARY_TOOL, KNOWLEDGE_MAX_AGE
 
 
-# Initialize the external tools
-tavily = TavilySearchResults(max_results=3)
+# External clients are built on first use, not at import time, so listing
+# tools and importing this module stay cheap.
 params = {"engine": "google", "gl": "us", "hl": "en"}
-serpapi = SerpAPIWrapper(params=params)
-duckduckgo = DuckDuckGoSearchAPIWrapper()
-wikipedia = WikipediaAPIWrapper()
-google_search = GoogleSerperAPIWrapper()
+
+
+def _create_tavily():
+    from agents.pooled_clients import PooledTavilySearchAPIWrapper, PooledTavilySearchResults
+    return PooledTavilySearchResults(max_results=3, api_wrapper=PooledTavilySearchAPIWrapper())
+
+
+def _create_tavily_client():
+    from tavily import TavilyClient
+    return TavilyClient(session=HttpSessions.get("tavily_client"))
+
+
+def _create_serpapi():
+    from agents.pooled_clients import PooledSerpAPIWrapper
+    return PooledSerpAPIWrapper(params=params)
+
+
+def _create_duckduckgo():
+    from langchain_community.utilities import DuckDuckGoSearchAPIWrapper
+    return DuckDuckGoSearchAPIWrapper()
+
+
+def _create_wikipedia():
+    from langchain_community.utilities import WikipediaAPIWrapper
+    return WikipediaAPIWrapper()
+
+
+def _create_google_search():
+    from agents.pooled_clients import PooledGoogleSerperAPIWrapper
+    return PooledGoogleSerperAPIWrapper()
+
+
+_CLIENT_FACTORIES = {
+    "tavily": _create_tavily,
+    "tavily_client": _create_tavily_client,
+    "serpapi": _create_serpapi,
+    "duckduckgo": _create_duckduckgo,
+    "wikipedia": _create_wikipedia,
+    "google_search": _create_google_search,
+}
+
+
+def __getattr__(name: str):
+    # Keep the former module-level clients importable, built lazily
+    if name in _CLIENT_FACTORIES:
+        return SearchTools.get_client(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class SearchTools:
@@ -29,9 +75,21 @@ class SearchTools:
         Returns:
             str: Search results content
         """
-        client = TavilyClient()
-        response = client.search(query, max_results=3, search_depth="Advanced")
-        return response['results']
+        def search(query: str):
+            client = SearchTools.get_client("tavily_client")
+            response = client.search(
+                query, max_results=3, search_depth="Advanced", timeout=HttpSessions.timeout()[1]
+            )
+            return response['results']
+
+        def fetch():
+            RateLimiter.get("tavily").acquire()
+            results = HedgedSearch.tracker.wrap("search_tavily", search)(query)
+            KnowledgeIndex.record("search_tavily", query, results)
+            return results
+
+        # The cache keeps the full results; compression is applied on the way out
+        return ObservationCompressor.compress(query, ToolCache.fetch("search_tavily", query, fetch))
     
     # @staticmethod
     # @tool
@@ -103,38 +161,206 @@ class SearchTools:
     #     """
     #     return SearchTools.google_search.run(query)
 
+    # Tools backed by a shared client: name, client key, rate-limit provider, description
+    TOOL_SPECS = [
+        {
+            "name": "SerpAPI",
+            "client": "serpapi",
+            "provider": "serpapi",
+            "description": "A powerful web search tool that provides comprehensive results from Google. Use this for general queries, fact-checking, and finding up-to-date information on a wide range of topics. It's particularly useful for current events, popular culture, and general knowledge questions.",
+        },
+        {
+            "name": "DuckDuckGo Search",
+            "client": "duckduckgo",
+            "provider": "duckduckgo",
+            "description": "A privacy-focused search engine that offers unbiased results. Use this tool when you need to find information on topics that might be controversial or when you want to avoid personalized search results. It's excellent for gathering diverse viewpoints and alternative sources.",
+        },
+        {
+            "name": "Wikipedia",
+            "client": "wikipedia",
+            "provider": "wikipedia",
+            "description": "An extensive online encyclopedia that provides detailed background information on a vast array of topics. Use this tool when you need in-depth explanations, historical context, or comprehensive overviews of subjects. It's particularly useful for academic topics, biographies, and understanding complex concepts.",
+        },
+        {
+            "name": "Tavily Search",
+            "client": "tavily",
+            "provider": "tavily",
+            "description": "Use when you to serach the web",
+        },
+        {
+            "name": "Google Search",
+            "client": "google_search",
+            "provider": "serper",
+            "description": "Use when you to serach the web",
+        },
+    ]
+
+    HEDGED_TOOL = {
+        "name": "Hedged Search",
+        "description": "Use when you to serach the web. Asks a second search engine when the first one is slow, and uses whichever answers first.",
+    }
+
+    LOCAL_KNOWLEDGE_TOOL = {
+        "name": "Local Knowledge",
+        "description": "Searches results of earlier web searches stored on this machine and answers in milliseconds. Try it first; if it has nothing relevant, use a web search tool.",
+    }
+
+    _clients: Dict[str, Any] = {}
+    _tools: List[Tool] = []
+    _lock = threading.RLock()
+
+    @staticmethod
+    def get_client(name: str) -> Any:
+        """
+        Return the shared client for a search backend, building it on first use.
+
+        Args:
+            name: Client key, e.g. 'serpapi' or 'wikipedia'
+
+        Returns:
+            Any: The client instance
+        """
+        with SearchTools._lock:
+            client = SearchTools._clients.get(name)
+            if client is None:
+                client = _CLIENT_FACTORIES[name]()
+                SearchTools._clients[name] = client
+            return client
+
+    @staticmethod
+    def _lazy_run(client_name: str):
+        """Return a tool function that builds its client on the first call."""
+        def run(query: str) -> str:
+            return SearchTools.get_client(client_name).run(query)
+        return run
+
+    @staticmethod
+    def list_tool_metadata() -> List[Dict[str, str]]:
+        """
+        Returns the name and description of every tool without building any clients.
+
+        Returns:
+            list: Dicts with 'name' and 'description'
+        """
+        return [{"name": SearchTools.search_tavily.name, "description": SearchTools.search_tavily.description}] + [
+            {"name": spec["name"], "description": spec["description"]}
+            for spec in SearchTools.TOOL_SPECS + [SearchTools.HEDGED_TOOL, SearchTools.LOCAL_KNOWLEDGE_TOOL]
+        ]
+
     @staticmethod
     def get_tool_list():
         """
         Returns the list of available tools.
 
+        The Tool objects are built once and reused; their clients are only
+        created when a tool is first called.
+
         Returns:
             list: List of tool instances
         """
-        return [SearchTools.search_tavily,
-            Tool(
-        name="SerpAPI",
-        func= serpapi.run,
-        description="A powerful web search tool that provides comprehensive results from Google. Use this for general queries, fact-checking, and finding up-to-date information on a wide range of topics. It's particularly useful for current events, popular culture, and general knowledge questions.",
-    ),
-    Tool(
-        name="DuckDuckGo Search",
-        func=duckduckgo.run,
-        description="A privacy-focused search engine that offers unbiased results. Use this tool when you need to find information on topics that might be controversial or when you want to avoid personalized search results. It's excellent for gathering diverse viewpoints and alternative sources.",
-    ),
-    Tool(
-        name="Wikipedia",
-        func=wikipedia.run,
-        description="An extensive online encyclopedia that provides detailed background information on a vast array of topics. Use this tool when you need in-depth explanations, historical context, or comprehensive overviews of subjects. It's particularly useful for academic topics, biographies, and understanding complex concepts.",
-    ),
-    Tool(
-        name="Tavily Search",
-        func=tavily.run,
-        description="Use when you to serach the web"
-    ),
-    Tool(
-        name="Google Search",
-        func=google_search.run,
-        description="Use when you to serach the web"
-    ),
-]
+        with SearchTools._lock:
+            if not SearchTools._tools:
+                SearchTools._tools = [SearchTools.search_tavily] + [
+                    Tool(
+                        name=spec["name"],
+                        # Only real calls are indexed and timed, so fetch times
+                        # and hedging thresholds stay true
+                        func=ObservationCompressor.wrap(ToolCache.wrap(
+                            spec["name"],
+                            KnowledgeIndex.wrap(
+                                spec["name"],
+                                RateLimiter.wrap(spec["provider"], HedgedSearch.tracker.wrap(
+                                    spec["name"], SearchTools._lazy_run(spec["client"])
+                                )),
+                            ),
+                        )),
+                        description=spec["description"],
+                    )
+                    for spec in SearchTools.TOOL_SPECS
+                ]
+                SearchTools._tools.append(SearchTools.create_hedged_tool(
+                    SearchTools._find_tool(SearchTools._tools, HEDGE_PRIMARY_TOOL),
+                    SearchTools._find_tool(SearchTools._tools, HEDGE_SECONDARY_TOOL),
+                ))
+                SearchTools._tools.append(SearchTools.create_local_knowledge_tool())
+            return list(SearchTools._tools)
+
+    @staticmethod
+    def _find_tool(tools: List[Tool], name: str):
+        return next((t for t in tools if t.name == name), None)
+
+    @staticmethod
+    def create_hedged_tool(primary, secondary, merge: bool = False, name: str = HEDGED_TOOL["name"]) -> Tool:
+        """
+        Build a tool that searches with ``primary`` and hedges with ``secondary``.
+
+        Args:
+            primary: Tool asked first
+            secondary: Tool asked when the primary is slow or fails
+            merge: Merge both results when both arrive in time
+            name: Name of the new tool
+
+        Returns:
+            Tool: The hedged search tool
+        """
+        func = HedgedSearch(primary, secondary, merge=merge).run
+        if merge:
+            # Merged results can exceed the observation budget of either backend
+            func = ObservationCompressor.wrap(func)
+        return Tool(
+            name=name,
+            func=func,
+            description=SearchTools.HEDGED_TOOL["description"],
+        )
+
+    @staticmethod
+    def create_local_knowledge_tool(
+        max_age: Optional[float] = KNOWLEDGE_MAX_AGE, name: str = LOCAL_KNOWLEDGE_TOOL["name"]
+    ) -> Tool:
+        """
+        Build a tool that answers from the local index of earlier search results.
+
+        Args:
+            max_age: Ignore passages fetched longer ago than this many seconds
+                (no limit if None)
+            name: Name of the new tool
+
+        Returns:
+            Tool: The local knowledge tool
+        """
+        return Tool(
+            name=name,
+            func=ObservationCompressor.wrap(
+                lambda query: KnowledgeIndex.shared().lookup(query, max_age=max_age)
+            ),
+            description=SearchTools.LOCAL_KNOWLEDGE_TOOL["description"],
+        )
+
+    @staticmethod
+    def with_local_knowledge(tools: List) -> List:
+        """
+        Add the Local Knowledge tool after the given tools, so the agent can
+        check earlier results before a web search. Direct mode keeps using
+        the first tool.
+
+        Args:
+            tools: Selected search tools
+
+        Returns:
+            list: The tools followed by Local Knowledge
+        """
+        local = SearchTools.get_tool(SearchTools.LOCAL_KNOWLEDGE_TOOL["name"])
+        return [t for t in tools if t is not local] + [local]
+
+    @staticmethod
+    def get_tool(name: str):
+        """
+        Returns a single tool by name.
+
+        Args:
+            name: Tool name as listed by list_tool_metadata
+
+        Returns:
+            Tool instance, or None if there is no tool with that name
+        """
+        return SearchTools._find_tool(SearchTools.get_tool_list(), name)
@@ -1,16 +1,27 @@
 from fastapi import FastAPI, File, UploadFile, Form, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import List, Optional
 import pandas as pd
 import os
 from pathlib import Path
 import json
+import asyncio
+import uuid
 from main import WebSearchPipeline
-from config.settings import GROQ_MODEL_LIST, GOOGLE_MODEL_LIST
+from config.settings import GROQ_MODEL_LIST, GOOGLE_MODEL_LIST, CASCADE_MODELS, JOB_EVENT_POLL_INTERVAL
+from config.settings import AGENT_MAX_ITERATIONS, AGENT_MAX_EXECUTION_TIME
+from config.settings import RESULTS_MAX_PAGE_SIZE, RESPONSE_GZIP_MIN_SIZE, RUN_PIPELINE_MAX_ROWS
+from utils.job_manager import Job, JobManager
+from utils.metrics import MetricsRecorder
+from utils.query_generator import QueryGenerator
+from utils.result_handler import RESULT_VIEWS, ResultHandler
+from utils.upload_store import UploadStore
 from agents.tools import SearchTools
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
+from agents.agent_pool import AgentLease, AgentPool
 
 app = FastAPI()
 
@@ -22,11 +33,19 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# SSE streams are left uncompressed by the middleware
+app.add_middleware(GZipMiddleware, minimum_size=RESPONSE_GZIP_MIN_SIZE)
 
 # Create upload directory if it doesn't exist
 UPLOAD_DIR = Path("uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
 
+# Background pipeline runs
+job_manager = JobManager()
+
+# Warm LLM clients and agents shared by all requests
+agent_pool = AgentPool()
+
 class SearchRequest(BaseModel):
     query_template: str
     model_source: str
@@ -34,34 +53,52 @@ class SearchRequest(BaseModel):
     tool_name: str
     num_rows: int
     filename: str
+    max_concurrency: int = 1
+    cache_mode: str = "use"
+    llm_cache: bool = False
+    mode: str = "agent"
+    batch_size: int = 1
+    max_iterations: Optional[int] = AGENT_MAX_ITERATIONS
+    max_execution_time: Optional[float] = AGENT_MAX_EXECUTION_TIME
+    # Input columns to keep in the results besides the template placeholders (all if None)
+    include_columns: Optional[List[str]] = None
+    # Response projection: 'answers' leaves out the agent trace of each row
+    view: str = "trace"
+    # 'records' (one object per row) or 'columns' (column names sent once)
+    layout: str = "records"
+    # Also give the agent the Local Knowledge tool over earlier search results
+    local_knowledge: bool = False
 
 @app.get("/api/models")
 async def get_models():
     return {
         "groq": GROQ_MODEL_LIST,
-        "google": GOOGLE_MODEL_LIST
+        "google": GOOGLE_MODEL_LIST,
+        # Each cascade tries its models cheapest first, see CASCADE_MODELS
+        "cascade": CASCADE_MODELS,
     }
 
 @app.get("/api/tools")
 async def get_tools():
-    tools = SearchTools.get_tool_list()
-    return {"tools": [{"name": tool.name, "description": tool.description} for tool in tools]}
+    return {"tools": SearchTools.list_tool_metadata()}
 
 @app.post("/api/upload-csv")
 async def upload_csv(file: UploadFile = File(...)):
     try:
-        file_path = UPLOAD_DIR / file.filename
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
-        
-        # Validate CSV
-        df = pd.read_csv(file_path)
+        filename = Path(file.filename).name
+        file_path = UPLOAD_DIR / filename
+        # Stream to disk in chunks so large uploads are never held in memory
+        saved = await UploadStore.save(file, file_path)
+
+        # Validate the CSV and convert it once to the columnar cache
+        record = await run_in_threadpool(UploadStore.ingest, file_path, saved["sha256"])
         return {
             "message": "File uploaded successfully",
-            "filename": file.filename,
-            "columns": df.columns.tolist(),
-            "row_count": len(df)
+            "filename": filename,
+            "columns": record["columns"],
+            "dtypes": record["dtypes"],
+            "row_count": record["row_count"],
+            "sha256": record["sha256"],
         }
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -69,6 +106,10 @@ async def upload_csv(file: UploadFile = File(...)):
 @app.post("/api/connect-gsheet")
 async def connect_gsheet(sheet_url: str = Form(...)):
     try:
+        # Imported here so API startup does not pay for the Google clients
+        import gspread
+        from oauth2client.service_account import ServiceAccountCredentials
+
         # Initialize Google Sheets credentials
         scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
         creds = ServiceAccountCredentials.from_json_keyfile_name('path_to_your_credentials.json', scope)
@@ -83,49 +124,260 @@ async def connect_gsheet(sheet_url: str = Form(...)):
         filename = f"gsheet_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv"
         file_path = UPLOAD_DIR / filename
         df.to_csv(file_path, index=False)
+        record = UploadStore.ingest(file_path)
         
         return {
             "message": "Google Sheet connected successfully",
             "filename": filename,
-            "columns": df.columns.tolist(),
-            "row_count": len(df)
+            "columns": record["columns"],
+            "dtypes": record["dtypes"],
+            "row_count": record["row_count"],
+            "sha256": record["sha256"],
         }
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+def _select_tool(request: SearchRequest):
+    """Validate the request's file and tool, returning the selected tool."""
+    file_path = UPLOAD_DIR / request.filename
+    if not file_path.exists():
+        raise HTTPException(status_code=404, detail="File not found")
+
+    selected_tool = SearchTools.get_tool(request.tool_name)
+
+    if not selected_tool:
+        raise HTTPException(status_code=400, detail="Invalid tool selection")
+    return selected_tool
+
+def _request_tools(request: SearchRequest, selected_tool) -> List:
+    """Return the tools a request's agent may call."""
+    if request.local_knowledge:
+        return SearchTools.with_local_knowledge([selected_tool])
+    return [selected_tool]
+
+def _check_sync_rows(request: SearchRequest) -> None:
+    """Send runs too large for one response to the jobs API."""
+    row_count = UploadStore.ingest(UPLOAD_DIR / request.filename)["row_count"]
+    if min(request.num_rows, row_count) > RUN_PIPELINE_MAX_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"run-pipeline answers at most {RUN_PIPELINE_MAX_ROWS} rows; "
+                   "submit larger runs to /api/jobs and page through their results",
+        )
+
+def _checkout_agent(request: SearchRequest, selected_tool) -> AgentLease:
+    """Lease a warm agent and LLM client for the request from the pool."""
+    return agent_pool.checkout(
+        request.model_name,
+        _request_tools(request, selected_tool),
+        llm_cache=request.llm_cache,
+        max_iterations=request.max_iterations,
+        max_execution_time=request.max_execution_time,
+    )
+
+def _build_pipeline(request: SearchRequest, selected_tool, output_path: Path, **kwargs) -> WebSearchPipeline:
+    """Load the uploaded file and build a pipeline for the request."""
+    # Every column is kept by default; with include_columns, only those and
+    # the template placeholders are read from the upload's cache
+    columns = None
+    if request.include_columns is not None:
+        placeholders = QueryGenerator.extract_placeholders(request.query_template)
+        columns = list(dict.fromkeys(placeholders + request.include_columns))
+    df = UploadStore.load(UPLOAD_DIR / request.filename, columns=columns, num_rows=request.num_rows)
+    return WebSearchPipeline(
+        data_source=df,
+        query_template=request.query_template,
+        model_name=request.model_name,
+        output_path=str(output_path),
+        num_rows=request.num_rows,
+        tools=_request_tools(request, selected_tool),
+        max_concurrency=request.max_concurrency,
+        cache_mode=request.cache_mode,
+        llm_cache=request.llm_cache,
+        mode=request.mode,
+        batch_size=request.batch_size,
+        max_iterations=request.max_iterations,
+        max_execution_time=request.max_execution_time,
+        **kwargs,
+    )
+
+RESULT_LAYOUTS = ("records", "columns")
+
+def _check_projection(view: str, layout: str = "records") -> None:
+    """Reject unknown result views and layouts."""
+    if view not in RESULT_VIEWS:
+        raise HTTPException(status_code=400, detail=f"view must be one of {RESULT_VIEWS}")
+    if layout not in RESULT_LAYOUTS:
+        raise HTTPException(status_code=400, detail=f"layout must be one of {RESULT_LAYOUTS}")
+
+def _pipeline_response(results_df: pd.DataFrame, results: List, summary: dict, view: str, layout: str) -> dict:
+    """Build the run-pipeline response for the requested projection."""
+    if layout == "columns":
+        response = {"results_df": results_df.to_dict(orient="split", index=False)}
+    else:
+        response = {"results_df": results_df.to_dict(orient="records")}
+    if view == "trace":
+        response["results"] = results
+    response["summary"] = summary
+    return response
+
 @app.post("/api/run-pipeline")
 async def run_pipeline(request: SearchRequest):
     try:
-        file_path = UPLOAD_DIR / request.filename
-        if not file_path.exists():
-            raise HTTPException(status_code=404, detail="File not found")
-        
-        df = pd.read_csv(file_path)
-        tools = SearchTools.get_tool_list()
-        selected_tool = next((tool for tool in tools if tool.name == request.tool_name), None)
-        
-        if not selected_tool:
-            raise HTTPException(status_code=400, detail="Invalid tool selection")
-        
-        pipeline = WebSearchPipeline(
-            data_source=df,
-            query_template=request.query_template,
-            model_name=request.model_name,
-            output_path=str(UPLOAD_DIR / "search_results.csv"),
-            rate_limit=1.0,
-            num_rows=request.num_rows,
-            tools=[selected_tool],
-        )
-        
-        results_df, results = pipeline.run()
+        _check_projection(request.view, request.layout)
+        selected_tool = _select_tool(request)
+        await run_in_threadpool(_check_sync_rows, request)
+
+        # Build and run off the event loop so other clients are still served
+        lease = await run_in_threadpool(_checkout_agent, request, selected_tool)
+        # Each call gets its own output so overlapping requests don't collide.
+        # The results are returned in the response, so the call is not
+        # journaled and its output is deleted once read.
+        output_path = UPLOAD_DIR / f"results_{uuid.uuid4().hex}.csv"
+        try:
+            pipeline = await run_in_threadpool(
+                _build_pipeline, request, selected_tool, output_path,
+                llm=lease.llm, agent=lease.agent,
+            )
+            results_df, results = await run_in_threadpool(pipeline.run, save_intermediate=False)
+        finally:
+            lease.release()
+            if output_path.exists():
+                output_path.unlink()
         
-        return {
-            "results_df": results_df.to_dict(orient="records"),
-            "results": results
-        }
+        return _pipeline_response(results_df, results, pipeline.summary, request.view, request.layout)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _get_job(job_id: str) -> Job:
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.post("/api/jobs")
+async def submit_job(request: SearchRequest):
+    selected_tool = _select_tool(request)
+
+    def build(job: Job) -> WebSearchPipeline:
+        lease = _checkout_agent(request, selected_tool)
+        job.cleanup.append(lease.release)
+        return _build_pipeline(
+            request,
+            selected_tool,
+            UPLOAD_DIR / f"results_{job.id}.csv",
+            on_row_complete=job.add_row,
+            cancel_event=job.cancel_event,
+            llm=lease.llm,
+            agent=lease.agent,
+        )
+
+    job = job_manager.submit(build)
+    return {"job_id": job.id, "status": job.status}
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    return _get_job(job_id).to_dict()
+
+@app.get("/api/jobs/{job_id}/results")
+async def get_job_results(
+    job_id: str,
+    cursor: Optional[str] = None,
+    offset: int = 0,
+    limit: int = 100,
+    view: str = "trace",
+    layout: str = "records",
+):
+    """
+    Page through a job's finished rows in completion order.
+
+    Pass the returned ``next_cursor`` as ``cursor`` to get the next page; it
+    is None once the job is over and every row has been returned. Rows only
+    ever get appended, so a cursor stays valid while the job runs.
+    """
+    _check_projection(view, layout)
+    job = _get_job(job_id)
+    if cursor is not None:
+        try:
+            offset = int(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    limit = max(1, min(limit, RESULTS_MAX_PAGE_SIZE))
+
+    # Read the status before the rows so the last page is not missed
+    done = job.done
+    rows = [ResultHandler.project_row(row, view) for row in job.rows_since(offset, limit, view)]
+    next_offset = offset + len(rows)
+    exhausted = done and next_offset >= job.completed_rows
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "offset": offset,
+        "next_offset": next_offset,
+        "next_cursor": None if exhausted else str(next_offset),
+        "rows": ResultHandler.to_columns(rows) if layout == "columns" else rows,
+    }
+
+async def _follow_job_rows(job: Job, view: str = "trace"):
+    """Yield a job's rows as they finish, until the job is over."""
+    offset = 0
+    while True:
+        # Read the status before the rows so no row is missed at the end
+        done = job.done
+        # Read a page at a time so a late client does not load every trace at once
+        rows = job.rows_since(offset, RESULTS_MAX_PAGE_SIZE, view)
+        for row in rows:
+            yield ResultHandler.project_row(row, view)
+        offset += len(rows)
+        if len(rows) == RESULTS_MAX_PAGE_SIZE:
+            continue
+        if done:
+            return
+        await asyncio.sleep(JOB_EVENT_POLL_INTERVAL)
+
+@app.get("/api/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, view: str = "trace"):
+    _check_projection(view)
+    job = _get_job(job_id)
+
+    async def events():
+        async for row in _follow_job_rows(job, view):
+            yield f"event: row\ndata: {json.dumps(row, default=str)}\n\n"
+        yield f"event: status\ndata: {json.dumps(job.to_dict(), default=str)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+@app.get("/api/jobs/{job_id}/export")
+async def export_job_results(job_id: str, view: str = "answers"):
+    """Stream a job's rows as newline-delimited JSON, following the job until it is over."""
+    _check_projection(view)
+    job = _get_job(job_id)
+
+    async def lines():
+        async for row in _follow_job_rows(job, view):
+            yield json.dumps(row, default=str, separators=(",", ":")) + "\n"
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="results_{job.id}.ndjson"'},
+    )
+
+@app.delete("/api/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    _get_job(job_id)
+    return job_manager.cancel(job_id).to_dict()
+
+@app.get("/metrics")
+async def metrics():
+    """Latency, token, iteration, rate-limit and error metrics of all runs in Prometheus text format."""
+    return PlainTextResponse(
+        MetricsRecorder.shared().prometheus_text(),
+        media_type="text/plain; version=0.0.4",
+    )
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
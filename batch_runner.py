@@ -0,0 +1,191 @@
+"""
+Headless batch runner for very large spreadsheets.
+
+The input CSV is split into shards, each shard is searched by its own
+WebSearchPipeline (with its own agent and LLM client) in a separate process,
+and the shard outputs are merged back in the original row order.
+
+Example:
+    python batch_runner.py AI_Companies.csv \
+        --template "Get me the details of {Company_Name}" \
+        --model llama-3.1-8b-instant --tool "Google Search" \
+        --shard-size 500 --processes 4 --output search_results.csv
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pandas as pd
+
+from config.settings import DEFAULT_MODEL, AGENT_MAX_ITERATIONS, AGENT_MAX_EXECUTION_TIME, DATA_CHUNK_ROWS
+
+
+def split_into_shards(input_path: str, shard_dir: Path, shard_size: int) -> List[Path]:
+    """
+    Stream the input CSV into shard files of ``shard_size`` rows.
+
+    Args:
+        input_path: Path of the input CSV
+        shard_dir: Directory the shards are written to
+        shard_size: Rows per shard
+
+    Returns:
+        List[Path]: Shard paths in input order
+    """
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    shards = []
+    for i, chunk in enumerate(pd.read_csv(input_path, dtype=str, chunksize=shard_size)):
+        shard_path = shard_dir / f"shard_{i:05d}.csv"
+        chunk.to_csv(shard_path, index=False)
+        shards.append(shard_path)
+    return shards
+
+
+def init_worker(share: float) -> None:
+    """
+    Give a worker process its share of the provider rate limits, so all
+    workers together stay within PROVIDER_RATE_LIMITS.
+
+    Args:
+        share: Fraction of the limits for this process
+    """
+    from utils.rate_limiter import RateLimiter
+    RateLimiter.set_share(share)
+
+
+def run_shard(shard_path: str, output_path: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Search one shard in the current process. Runs in a worker process, so
+    the agent, LLM client and tools are all created here.
+
+    Args:
+        shard_path: Path of the shard CSV
+        output_path: Where the shard results are written
+        options: Pipeline settings from the command line
+
+    Returns:
+        Dict[str, Any]: Shard output path and run summary
+    """
+    from main import WebSearchPipeline
+    from agents.tools import SearchTools
+
+    tool = SearchTools.get_tool(options["tool"])
+    if tool is None:
+        raise ValueError(f"Unknown tool '{options['tool']}'")
+
+    pipeline = WebSearchPipeline(
+        data_source=str(shard_path),
+        query_template=options["template"],
+        model_name=options["model"],
+        tools=[tool],
+        output_path=output_path,
+        max_concurrency=options["max_concurrency"],
+        cache_mode=options["cache_mode"],
+        llm_cache=options["llm_cache"],
+        mode=options["mode"],
+        batch_size=options["batch_size"],
+        max_iterations=options["max_iterations"],
+        max_execution_time=options["max_execution_time"],
+        resume=options["resume"],
+    )
+    pipeline.run()
+    return {"shard": shard_path, "output": output_path, "summary": pipeline.summary}
+
+
+def merge_shard_outputs(outputs: List[str], output_path: str) -> int:
+    """
+    Concatenate shard outputs, in shard order, into the final CSV one chunk
+    at a time. Values are copied as text so they are not re-typed (a zip
+    code like 01234 stays 01234).
+
+    Args:
+        outputs: Shard output paths in input order
+        output_path: Path of the merged CSV
+
+    Returns:
+        int: Number of rows written
+    """
+    rows = 0
+    for shard_output in outputs:
+        for chunk in pd.read_csv(shard_output, dtype=str, keep_default_na=False, chunksize=DATA_CHUNK_ROWS):
+            chunk.to_csv(output_path, mode="w" if rows == 0 else "a", header=rows == 0, index=False)
+            rows += len(chunk)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the web search pipeline over a large CSV in parallel shards.")
+    parser.add_argument("input", help="Input CSV file")
+    parser.add_argument("--template", required=True, help="Query template, e.g. 'Details of {Company_Name}'")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="Model name from GROQ_MODEL_LIST or GOOGLE_MODEL_LIST")
+    parser.add_argument("--tool", default="Google Search", help="Name of the search tool to use")
+    parser.add_argument("--output", default="search_results.csv", help="Merged output CSV")
+    parser.add_argument("--shard-size", type=int, default=1000, help="Rows per shard")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--max-concurrency", type=int, default=4, help="Rows searched in parallel within each shard")
+    parser.add_argument("--cache-mode", default="use", choices=["use", "refresh", "bypass"], help="Tool cache mode")
+    parser.add_argument("--llm-cache", action="store_true", help="Serve identical LLM calls from the persistent cache")
+    parser.add_argument("--mode", default="agent", choices=["agent", "direct"],
+                        help="'direct' searches once and extracts with one LLM call, falling back to the agent")
+    parser.add_argument("--batch-size", type=int, default=1,
+                        help="Rows extracted per LLM call in direct mode")
+    parser.add_argument("--max-iterations", type=int, default=AGENT_MAX_ITERATIONS,
+                        help="Agent tool calls per row before answering from partial results")
+    parser.add_argument("--max-execution-time", type=float, default=AGENT_MAX_EXECUTION_TIME,
+                        help="Agent seconds per row before answering from partial results")
+    parser.add_argument("--work-dir", default=None, help="Directory for shards and shard outputs")
+    parser.add_argument("--resume", action="store_true", help="Reuse existing shards and skip journaled rows")
+    args = parser.parse_args()
+
+    work_dir = Path(args.work_dir or f"{Path(args.output).stem}_shards")
+    existing = sorted(work_dir.glob("shard_[0-9][0-9][0-9][0-9][0-9].csv"))
+    if args.resume and existing:
+        shards = existing
+        print(f"Resuming with {len(shards)} existing shards in {work_dir}")
+    else:
+        shards = split_into_shards(args.input, work_dir, args.shard_size)
+        print(f"Split {args.input} into {len(shards)} shards of up to {args.shard_size} rows")
+
+    options = {
+        "template": args.template,
+        "model": args.model,
+        "tool": args.tool,
+        "max_concurrency": args.max_concurrency,
+        "cache_mode": args.cache_mode,
+        "llm_cache": args.llm_cache,
+        "mode": args.mode,
+        "batch_size": args.batch_size,
+        "max_iterations": args.max_iterations,
+        "max_execution_time": args.max_execution_time,
+        "resume": args.resume,
+    }
+    outputs = [str(shard.with_name(f"{shard.stem}_results.csv")) for shard in shards]
+
+    # Workers share the API keys, so each one gets an equal part of the rate limits
+    processes = max(1, min(args.processes, len(shards)))
+    failed = []
+    with ProcessPoolExecutor(max_workers=processes, initializer=init_worker, initargs=(1 / processes,)) as executor:
+        futures = {
+            executor.submit(run_shard, str(shard), output, options): shard
+            for shard, output in zip(shards, outputs)
+        }
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+                print(f"Finished {result['shard']}: {result['summary']}")
+            except Exception as e:
+                print(f"Error processing {futures[future]}: {e}")
+                failed.append(futures[future])
+
+    if failed:
+        print(f"{len(failed)} shards failed; rerun with --resume to retry them")
+        raise SystemExit(1)
+
+    rows = merge_shard_outputs(outputs, args.output)
+    print(f"Merged {rows} rows into {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Deterministic stand-ins for the chat models and search tools, so pipeline
+throughput can be measured without API keys or network access.
+"""
+import random
+import re
+import time
+import zlib
+from typing import Any, List, Optional
+
+from langchain.tools import Tool
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from agents.tools import SearchTools
+from utils.cache import ToolCache
+
+
+def _seeded(text: str) -> random.Random:
+    """Return a random generator seeded from the text, so runs are repeatable."""
+    return random.Random(zlib.crc32(text.encode("utf-8")))
+
+
+def _sleep(latency: float, jitter: float, rng: random.Random) -> None:
+    if latency > 0:
+        time.sleep(latency * (1 + jitter * (2 * rng.random() - 1)))
+
+
+class FakeReActChatModel(BaseChatModel):
+    """
+    Chat model that answers the prompts used by this project.
+
+    - ReAct prompts (``SearchAgent``): the first turn calls the first tool
+      listed in the prompt with the question; once an observation is in the
+      scratchpad it returns a final answer.
+    - Direct extraction prompts (``DirectExtractor``): returns an answer.
+    - Batched extraction prompts: returns a JSON object keyed by question id.
+
+    Each call sleeps ``latency`` seconds, varied by up to ``jitter`` (a
+    fraction of the latency) with a generator seeded from the prompt.
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    tokens_per_char: float = 0.25
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-react"
+
+    @staticmethod
+    def _answer(question: str) -> str:
+        return f"Details for '{question}': contact@example.com (ref {zlib.crc32(question.encode('utf-8')) % 10000})"
+
+    def _respond(self, prompt: str) -> str:
+        if prompt.rstrip().endswith("JSON:"):
+            questions = re.findall(r"Question (q\d+): (.*)", prompt)
+            pairs = ", ".join(f'"{key}": "{self._answer(question)}"' for key, question in questions)
+            return "{" + pairs + "}"
+
+        question = re.findall(r"Question: (.*)", prompt)[-1].strip()
+        if prompt.rstrip().endswith("Answer:"):
+            return self._answer(question)
+
+        scratchpad = prompt.rsplit("Begin!", 1)[-1]
+        if "Observation:" in scratchpad:
+            return f"Thought: I now know the final answer\nFinal Answer: {self._answer(question)}"
+
+        tools = re.search(r"should be one of \[(.*?)\]", prompt)
+        tool = tools.group(1).split(", ")[0] if tools else "Search"
+        return f"Thought: I should search for this\nAction: {tool}\nAction Input: {question}"
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        prompt = "\n".join(str(message.content) for message in messages)
+        _sleep(self.latency, self.jitter, _seeded(prompt))
+        text = self._respond(prompt)
+
+        input_tokens = int(len(prompt) * self.tokens_per_char)
+        output_tokens = int(len(text) * self.tokens_per_char)
+        message = AIMessage(
+            content=text,
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def fake_search(name: str, latency: float = 0.0, jitter: float = 0.0, results: int = 3):
+    """
+    Build a search function that returns synthetic result snippets.
+
+    Args:
+        name: Tool name, used in the snippets
+        latency: Seconds each call sleeps
+        jitter: Latency variation as a fraction of ``latency``
+        results: Number of snippets per call
+
+    Returns:
+        Callable: Function taking a query and returning text
+    """
+    def search(query: str) -> str:
+        rng = _seeded(f"{name}:{query}")
+        _sleep(latency, jitter, rng)
+        return "\n".join(
+            f"[{name} result {k + 1}] {query}: synthetic snippet {rng.randint(0, 10 ** 6)} "
+            f"with contact@example.com and background information."
+            for k in range(results)
+        )
+
+    return search
+
+
+def create_fake_tools(latency: float = 0.0, jitter: float = 0.0) -> List[Tool]:
+    """
+    Return fake tools with the names and descriptions of
+    ``SearchTools.get_tool_list``, wrapped in the tool cache like the real ones.
+
+    Args:
+        latency: Seconds each call sleeps
+        jitter: Latency variation as a fraction of ``latency``
+
+    Returns:
+        List[Tool]: Fake tools
+    """
+    specs = [{"name": SearchTools.search_tavily.name, "description": SearchTools.search_tavily.description}]
+    specs += [{"name": spec["name"], "description": spec["description"]} for spec in SearchTools.TOOL_SPECS]
+    return [
+        Tool(
+            name=spec["name"],
+            func=ToolCache.wrap(spec["name"], fake_search(spec["name"], latency, jitter)),
+            description=spec["description"],
+        )
+        for spec in specs
+    ]
@@ -0,0 +1,70 @@
+"""
+Import-time and per-request overhead benchmark for the tool registry.
+
+Each module is imported in a fresh interpreter so the numbers reflect a cold
+start. Run from the repository root:
+
+    python benchmarks/import_time.py --repeat 5
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+MODULES = ["agents.tools", "main", "app"]
+
+
+def time_import(module: str, repeat: int) -> list:
+    """Return wall-clock seconds for importing a module in fresh interpreters."""
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - start)"
+    )
+    timings = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return timings
+
+
+def time_call(func, repeat: int) -> list:
+    """Return wall-clock seconds for repeated in-process calls."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def report(label: str, timings: list) -> None:
+    print(f"{label:<40} median {statistics.median(timings) * 1000:9.2f} ms   "
+          f"min {min(timings) * 1000:9.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for module in MODULES:
+        try:
+            report(f"import {module}", time_import(module, args.repeat))
+        except subprocess.CalledProcessError as e:
+            print(f"import {module:<33} failed: {e.stderr.strip().splitlines()[-1]}")
+
+    sys.path.insert(0, str(ROOT))
+    from agents.tools import SearchTools
+
+    report("SearchTools.list_tool_metadata()", time_call(SearchTools.list_tool_metadata, args.repeat * 20))
+    report("SearchTools.get_tool_list() first call", time_call(SearchTools.get_tool_list, 1))
+    report("SearchTools.get_tool_list() cached", time_call(SearchTools.get_tool_list, args.repeat * 20))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Offline pipeline throughput benchmark using the fake chat model and tools.
+
+Each scenario runs in a fresh interpreter so its peak memory is measured in
+isolation. Run from the repository root:
+
+    python benchmarks/pipeline_throughput.py --scenario companies --concurrency 16
+    python benchmarks/pipeline_throughput.py --scenario synthetic-100k --mode direct --batch-size 10
+"""
+import argparse
+import contextlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+COMPANIES_CSV = ROOT / "AI_Companies.csv"
+TEMPLATE = "Get me the details and email address of {Company_Name}"
+
+# rows=None uses every row of the input
+SCENARIOS = {
+    "companies": {"source": "companies", "rows": None},
+    "synthetic-100k": {"source": "synthetic", "rows": 100_000},
+}
+
+
+def peak_rss_mb() -> float:
+    """Return the peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def synthetic_companies(rows: int, distinct: float):
+    """
+    Build an input frame shaped like AI_Companies.csv.
+
+    Args:
+        rows: Number of rows
+        distinct: Fraction of rows with a distinct company name
+
+    Returns:
+        pd.DataFrame: Synthetic input
+    """
+    import pandas as pd
+
+    names = max(1, int(rows * distinct))
+    index = pd.RangeIndex(rows)
+    return pd.DataFrame({
+        "Company_Name": [f"Company {k % names}" for k in index],
+        "Website": [f"https://company-{k % names}.example.com/" for k in index],
+        "Location": ["Austin, TX"] * rows,
+        "Number of Employees": ["50 - 249"] * rows,
+    })
+
+
+def load_input(scenario: dict, args):
+    import pandas as pd
+
+    rows = args.rows or scenario["rows"]
+    if scenario["source"] == "companies":
+        df = pd.read_csv(COMPANIES_CSV)
+        return df if rows is None else df.head(rows)
+    return synthetic_companies(rows, args.distinct)
+
+
+def run_scenario(name: str, args) -> dict:
+    """Run one scenario in this process and return its measurements."""
+    sys.path.insert(0, str(ROOT))
+    from benchmarks.fakes import FakeReActChatModel, create_fake_tools
+    from models.llm import LLMFactory
+    from main import WebSearchPipeline
+
+    LLMFactory.create_llm = staticmethod(
+        lambda *_, **__: FakeReActChatModel(latency=args.llm_latency, jitter=args.jitter)
+    )
+    tools = {tool.name: tool for tool in create_fake_tools(args.tool_latency, args.jitter)}
+
+    df = load_input(SCENARIOS[name], args)
+    baseline_mb = peak_rss_mb()
+
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as devnull:
+        suffix = ".jsonl" if args.stream_output else ".csv"
+        with contextlib.redirect_stdout(devnull):
+            pipeline = WebSearchPipeline(
+                data_source=df,
+                query_template=TEMPLATE,
+                model_name="llama-3.1-8b-instant",
+                tools=[tools[args.tool]],
+                output_path=os.path.join(tmp, f"results{suffix}"),
+                max_concurrency=args.concurrency,
+                cache_mode=args.cache_mode,
+                deduplicate=not args.no_dedup,
+                stream_output=args.stream_output,
+                mode=args.mode,
+                batch_size=args.batch_size,
+            )
+            pipeline.agent.executor.verbose = False
+            start = time.perf_counter()
+            pipeline.run(save_intermediate=not args.no_journal)
+            elapsed = time.perf_counter() - start
+
+    metrics = pipeline.summary.get("metrics", {})
+    row_latency = metrics.get("histograms", {}).get("row_latency_seconds", {})
+    llm_calls = sum(value for key, value in metrics.get("counters", {}).items()
+                    if key.startswith("llm_calls_total"))
+    return {
+        "scenario": name,
+        "rows": len(df),
+        "distinct_queries": pipeline.summary.get("distinct_queries"),
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(len(df) / elapsed, 2) if elapsed else None,
+        "llm_calls": int(llm_calls),
+        "row_latency_p50": row_latency.get("p50"),
+        "row_latency_p95": row_latency.get("p95"),
+        "row_latency_p99": row_latency.get("p99"),
+        "baseline_rss_mb": round(baseline_mb, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def report(result: dict) -> None:
+    print(f"{result['scenario']:<16} {result['rows']:>8} rows  {result['seconds']:>9.2f} s  "
+          f"{result['rows_per_second']:>9.2f} rows/s  {result['llm_calls']:>7} LLM calls  "
+          f"row p50/p95/p99 {result['row_latency_p50']}/{result['row_latency_p95']}/{result['row_latency_p99']} s  "
+          f"peak RSS {result['peak_rss_mb']} MB (baseline {result['baseline_rss_mb']} MB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenario", default="all", choices=["all"] + list(SCENARIOS))
+    parser.add_argument("--rows", type=int, default=None, help="Override the scenario row count")
+    parser.add_argument("--distinct", type=float, default=0.5, help="Fraction of distinct synthetic companies")
+    parser.add_argument("--llm-latency", type=float, default=0.02, help="Seconds per fake LLM call")
+    parser.add_argument("--tool-latency", type=float, default=0.05, help="Seconds per fake tool call")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Latency variation as a fraction")
+    parser.add_argument("--tool", default="Google Search", help="Name of the fake tool to use")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--mode", default="agent", choices=["agent", "direct"])
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--cache-mode", default="bypass", choices=["use", "refresh", "bypass"])
+    parser.add_argument("--stream-output", action="store_true")
+    parser.add_argument("--no-dedup", action="store_true")
+    parser.add_argument("--no-journal", action="store_true")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON lines")
+    parser.add_argument("--in-process", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.in_process:
+        print(json.dumps(run_scenario(args.scenario, args)))
+        return
+
+    scenarios = list(SCENARIOS) if args.scenario == "all" else [args.scenario]
+    forwarded = [arg for arg in sys.argv[1:] if arg != "--json"]
+    for name in scenarios:
+        command = [sys.executable, __file__, *forwarded, "--scenario", name, "--in-process"]
+        # The fake tools share the real tools' names, so keep their observations
+        # out of the user's caches and knowledge index
+        with tempfile.TemporaryDirectory() as cache_dir:
+            env = {
+                **os.environ,
+                "TOOL_CACHE_PATH": os.path.join(cache_dir, "tool_cache.sqlite"),
+                "LLM_CACHE_PATH": os.path.join(cache_dir, "llm_cache.sqlite"),
+                "KNOWLEDGE_INDEX_PATH": os.path.join(cache_dir, "knowledge.sqlite"),
+            }
+            completed = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True)
+        if completed.returncode != 0:
+            print(f"{name} failed:\n{completed.stderr.strip()}")
+            continue
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        if args.json:
+            print(json.dumps(result))
+        else:
+            report(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -39,6 +39,102 @@ GOOGLE_MODEL_LIST = [
     "gemini-1.5-flash-8b",
 ]
 
+# Model cascades, cheapest tier first. A call escalates to the next tier
+# only when an answer fails validation; the last tier's answer is always used.
+CASCADE_MODELS = {
+    "groq-cascade": ["llama-3.1-8b-instant", "llama-3.1-70b-versatile", "llama-3.2-90b-vision-preview"],
+    "google-cascade": ["gemini-1.5-flash-8b", "gemini-1.5-flash", "gemini-1.5-pro"],
+}
+
 # # Default configurations
 DEFAULT_MODEL = "llama-3.2-90b-vision-preview"
-DEFAULT_TEMPERATURE = 0.5
\ No newline at end of file
+DEFAULT_TEMPERATURE = 0.5
+
+# Rate limits shared by every pipeline in the process, keyed by provider.
+# Values are per minute; omit a key to leave that dimension unlimited.
+PROVIDER_RATE_LIMITS = {
+    "groq": {"requests_per_minute": 30, "tokens_per_minute": 15000},
+    "google": {"requests_per_minute": 15, "tokens_per_minute": 1000000},
+    "tavily": {"requests_per_minute": 100},
+    "serpapi": {"requests_per_minute": 60},
+    "serper": {"requests_per_minute": 300},
+    "duckduckgo": {"requests_per_minute": 20},
+    "wikipedia": {"requests_per_minute": 200},
+}
+# Tokens reserved before each LLM call until the provider has reported usage;
+# after that the recent average per call is reserved
+LLM_DEFAULT_RESERVED_TOKENS = 1500
+# Fraction of the limits above this process may use, e.g. 0.25 for one of four
+# worker processes sharing the same API keys
+RATE_LIMIT_SHARE = float(os.getenv("RATE_LIMIT_SHARE", 1.0))
+
+# On-disk cache of search tool observations
+TOOL_CACHE_PATH = os.getenv("TOOL_CACHE_PATH", ".cache/tool_cache.sqlite")
+TOOL_CACHE_TTL = 7 * 24 * 60 * 60  # Seconds before a cached observation expires
+TOOL_CACHE_MAX_ENTRIES = 50000
+
+# Opt-in persistent cache of LLM completions
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".cache/llm_cache.sqlite")
+LLM_CACHE_TTL = None  # Completions never expire unless set in seconds
+LLM_CACHE_MAX_ENTRIES = 20000
+
+# Background jobs for the API
+JOB_MAX_WORKERS = 4  # Pipelines run at the same time; further jobs wait in the queue
+JOB_EVENT_POLL_INTERVAL = 0.5  # Seconds between checks for new rows in the SSE stream
+JOB_RETENTION_SECONDS = 60 * 60  # Finished jobs and their rows are dropped this long after they end
+JOB_MAX_FINISHED = 100  # Most finished jobs kept; the oldest are dropped first
+RESULTS_MAX_PAGE_SIZE = 1000  # Most rows returned by one page of job results
+RUN_PIPELINE_MAX_ROWS = 1000  # Most rows /api/run-pipeline answers in one response; larger runs go through /api/jobs
+RESPONSE_GZIP_MIN_SIZE = 1024  # Responses at least this many bytes are gzipped for clients that accept it
+
+# Pooled HTTP transport for the search tools
+HTTP_POOL_CONNECTIONS = 10  # Hosts kept in each session's pool
+HTTP_POOL_MAXSIZE = 32  # Keep-alive connections per host; match the pipeline concurrency
+HTTP_MAX_RETRIES = 2  # Retries on connection errors, and on 5xx responses to idempotent requests
+HTTP_TIMEOUT = (5, 30)  # (connect, read) timeout in seconds
+
+# Metrics
+METRICS_PREFIX = "breakout"
+METRICS_MAX_SAMPLES = 10000  # Recent samples kept per series for percentiles
+
+# Hedged search: ask a second backend when the first is slow
+HEDGE_PRIMARY_TOOL = "Google Search"
+HEDGE_SECONDARY_TOOL = "DuckDuckGo Search"
+HEDGE_QUANTILE = 0.95  # Hedge once the primary is slower than this share of its recent calls
+HEDGE_MIN_SAMPLES = 20  # Calls observed before the threshold adapts
+HEDGE_DEFAULT_DELAY = 1.0  # Seconds to wait before hedging until enough calls are observed
+HEDGE_MIN_DELAY = 0.25
+HEDGE_MAX_DELAY = 2.0  # Cap, so multi-second stalls are always hedged
+HEDGE_WINDOW = 200  # Recent latencies kept per backend
+HEDGE_MAX_WORKERS = 32  # Threads for backend calls, including slow calls left to finish
+
+# Per-row budgets for the ReAct agent
+AGENT_MAX_ITERATIONS = 6  # Tool calls before the agent is stopped
+AGENT_MAX_EXECUTION_TIME = 60.0  # Seconds before the agent is stopped
+AGENT_MAX_SCRATCHPAD_TOKENS = 3000  # Older observations are compacted beyond this size
+AGENT_COMPACTED_OBSERVATION_CHARS = 300  # Characters kept of a compacted observation
+
+# Warm pool of LLM clients and agents reused across runs
+AGENT_POOL_IDLE_TTL = 600  # Seconds an unused agent or client is kept
+AGENT_POOL_MAX_IDLE = 8  # Idle agents kept per (model, temperature, tools) key
+
+# Uploaded files
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # Bytes read from the request per write
+UPLOAD_SCHEMA_SAMPLE_ROWS = 1000  # Rows parsed to detect the columns and types of an upload
+UPLOAD_CACHE_DIR = os.getenv("UPLOAD_CACHE_DIR", ".cache/uploads")  # Parquet copies keyed by content hash
+UPLOAD_CONVERT_CHUNK_ROWS = 50000  # CSV rows parsed per step when converting an upload
+
+# Input loading
+DATA_CHUNK_ROWS = 50000  # CSV rows parsed per chunk when loading pipeline input
+
+# Tool observations
+OBSERVATION_COMPRESSION = os.getenv("OBSERVATION_COMPRESSION", "true").lower() == "true"  # Deduplicate and rank tool output
+OBSERVATION_MAX_TOKENS = 600  # Tokens of tool output kept per call, best BM25 passages first
+OBSERVATION_PASSAGE_CHARS = 400  # Characters per passage when splitting tool output
+
+# Local knowledge index
+KNOWLEDGE_INDEX_PATH = os.getenv("KNOWLEDGE_INDEX_PATH", ".cache/knowledge.sqlite")
+KNOWLEDGE_MAX_AGE = float(os.getenv("KNOWLEDGE_MAX_AGE", 30 * 24 * 60 * 60))  # Seconds before indexed passages are ignored
+KNOWLEDGE_MAX_PASSAGES = 200000  # Oldest passages beyond this are dropped
+KNOWLEDGE_RESULT_LIMIT = 8  # Passages returned per lookup
+KNOWLEDGE_MIN_TERM_MATCH = 0.5  # Fraction of query terms a returned passage must contain
@@ -1,6 +1,8 @@
 import pandas as pd
-from typing import Union
+from typing import Any, Iterator, List, Optional, Union
 from pathlib import Path
+from config.settings import DATA_CHUNK_ROWS
+from utils.query_generator import QueryGenerator
 
 class DataLoader:
     @staticmethod
@@ -24,6 +26,82 @@ class DataLoader:
         else:
             raise TypeError("Source must be a string path or URL")
 
+    @staticmethod
+    def read_columns(source: Union[str, Path]) -> List[str]:
+        """Return the column names of a CSV source without reading its rows."""
+        return pd.read_csv(source, nrows=0).columns.tolist()
+
+    @staticmethod
+    def iter_chunks(
+        source: Union[str, Path],
+        columns: Optional[List[str]] = None,
+        num_rows: Optional[int] = None,
+        chunk_size: int = DATA_CHUNK_ROWS,
+        dtype: Any = str,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Read a CSV source in chunks of rows.
+
+        Args:
+            source: Path to CSV file or Google Sheets URL
+            columns: Columns to read (all if None)
+            num_rows: Stop after this many rows (all if None)
+            chunk_size: Rows per chunk
+            dtype: Dtype of every column; str keeps values as written
+
+        Yields:
+            pd.DataFrame: The next chunk, indexed by row position in the source
+        """
+        reader = pd.read_csv(source, usecols=columns, dtype=dtype, chunksize=chunk_size, nrows=num_rows)
+        with reader:
+            for chunk in reader:
+                # usecols keeps file order; restore the requested order
+                yield chunk if columns is None else chunk[columns]
+
+    @staticmethod
+    def load_for_template(
+        source: Union[str, Path],
+        query_template: str,
+        num_rows: Optional[int] = None,
+        include_columns: Optional[List[str]] = None,
+        categorical: bool = False,
+        chunk_size: int = DATA_CHUNK_ROWS,
+    ) -> pd.DataFrame:
+        """
+        Load only the columns and rows a query template needs.
+
+        The header is read first to validate the placeholders, then the
+        placeholder columns and ``include_columns`` are read as strings in
+        chunks, stopping after ``num_rows`` rows.
+
+        Args:
+            source: Path to CSV file or Google Sheets URL
+            query_template: Template whose placeholders name the columns to read
+            num_rows: Read only the first rows (all if None)
+            include_columns: Other columns to keep; None keeps every column
+            categorical: Store columns whose values repeat a lot as categories
+            chunk_size: Rows parsed per chunk
+
+        Returns:
+            pd.DataFrame: The requested columns and rows
+        """
+        available = DataLoader.read_columns(source)
+        placeholders = QueryGenerator.extract_placeholders(query_template)
+        if include_columns is None:
+            columns = available
+        else:
+            columns = list(dict.fromkeys(placeholders + list(include_columns)))
+        DataLoader.validate_columns(pd.DataFrame(columns=available), columns + placeholders)
+
+        chunks = list(DataLoader.iter_chunks(source, columns, num_rows, chunk_size))
+        df = pd.concat(chunks) if chunks else pd.DataFrame(columns=columns, dtype=str)
+        if categorical:
+            for column in df.columns:
+                # Mostly unique columns would only grow
+                if df[column].nunique() <= len(df) // 2:
+                    df[column] = df[column].astype("category")
+        return df
+
     @staticmethod
     def validate_columns(df: pd.DataFrame, required_columns: list) -> bool:
         """
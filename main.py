@@ -1,40 +1,110 @@
 import pandas as pd
-from typing import Optional, List
+from typing import Optional, List, Dict, Any, Callable, Union
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextvars import copy_context
+import os
+import threading
 import time
 from data.data_loader import DataLoader
 from models.llm import LLMFactory
 from agents.tools import SearchTools
 from agents.search_agent import SearchAgent
+from config.settings import AGENT_MAX_ITERATIONS, AGENT_MAX_EXECUTION_TIME, AGENT_MAX_SCRATCHPAD_TOKENS
+from agents.direct_extractor import DirectExtractor
 from utils.query_generator import QueryGenerator
 from utils.result_handler import ResultHandler
+from utils.cache import LLMCache, ToolCache
+from utils.run_journal import RunJournal
+from utils.metrics import MetricsCallbackHandler, MetricsRecorder
 
 
 class WebSearchPipeline:
+    MODES = ("agent", "direct")
+
     def __init__(
         self,
-        data_source: pd.DataFrame,
+        data_source: Union[pd.DataFrame, str],  # DataFrame, or CSV path / Google Sheets URL read on demand
         query_template: str,
         model_name: str,
         tools: List,  # Parameterized tools list
         output_path: Optional[str] = None,
-        rate_limit: float = 1.0,  # Time in seconds between requests
+        rate_limit: float = 0.0,  # Extra delay in seconds between rows; providers are throttled by RateLimiter
         num_rows: Optional[int] = None,
+        max_concurrency: int = 1,  # Number of rows searched in parallel
+        cache_mode: str = "use",  # Tool cache mode: 'use', 'refresh' or 'bypass'
+        llm_cache: bool = False,  # Serve identical LLM calls from the persistent cache
+        deduplicate: bool = True,  # Search each distinct rendered query only once
+        journal_path: Optional[str] = None,  # Defaults to <output_path stem>.journal.jsonl
+        resume: bool = False,  # Skip rows already recorded in the journal
+        stream_output: bool = False,  # Write rows to output_path (.jsonl/.csv/.parquet) as they finish
+        on_row_complete: Optional[Callable[[int, str, Dict[str, Any]], None]] = None,  # Called per finished row
+        cancel_event: Optional[threading.Event] = None,  # Set to stop the run early
+        mode: str = "agent",  # 'agent' (ReAct loop) or 'direct' (one search + one extraction call)
+        batch_size: int = 1,  # Rows extracted per LLM call in 'direct' mode
+        max_iterations: Optional[int] = AGENT_MAX_ITERATIONS,  # Agent tool calls per row
+        max_execution_time: Optional[float] = AGENT_MAX_EXECUTION_TIME,  # Agent seconds per row
+        max_scratchpad_tokens: Optional[int] = AGENT_MAX_SCRATCHPAD_TOKENS,  # Older observations are compacted beyond this
+        llm: Any = None,  # Ready LLM client, e.g. from an AgentPool lease; built if None
+        agent: Optional[SearchAgent] = None,  # Ready agent for the same llm and tools; built if None
+        include_columns: Optional[List[str]] = None,  # Path sources: input columns kept besides placeholders; None keeps all
     ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if cache_mode not in ToolCache.MODES:
+            raise ValueError(f"cache_mode must be one of {ToolCache.MODES}")
+        if mode not in self.MODES:
+            raise ValueError(f"mode must be one of {self.MODES}")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if batch_size > 1 and mode != "direct":
+            raise ValueError("batch_size > 1 requires mode='direct'")
+
         self.data_source = data_source
         self.query_template = query_template
         self.model_name = model_name
         self.output_path = output_path or "search_results.csv"
         self.rate_limit = rate_limit
         self.num_rows = num_rows
+        self.include_columns = include_columns
+        self.max_concurrency = max_concurrency
+        self.cache_mode = cache_mode
+        self.llm_cache = llm_cache
+        self.deduplicate = deduplicate
+        self.journal_path = journal_path or f"{os.path.splitext(self.output_path)[0]}.journal.jsonl"
+        self.resume = resume
+        self.stream_output = stream_output
+        self.on_row_complete = on_row_complete
+        self.cancel_event = cancel_event or threading.Event()
+        self.mode = mode
+        self.batch_size = batch_size
+        self.summary: Dict[str, Any] = {}
+        self.metrics = MetricsRecorder(parent=MetricsRecorder.shared())
         self.tools = tools  # Assign tools to an instance variable
 
         # Initialize components
         self.df = self._load_data()
-        self.llm = LLMFactory.create_llm(model_name)
-        self.agent = SearchAgent(self.llm, self.tools)
+        self.llm = llm if llm is not None else LLMFactory.create_llm(model_name, cache=llm_cache)
+        self.agent = agent if agent is not None else SearchAgent(
+            self.llm,
+            self.tools,
+            max_iterations=max_iterations,
+            max_execution_time=max_execution_time,
+            max_scratchpad_tokens=max_scratchpad_tokens,
+        )
+        # The direct plan searches with the first tool only
+        self.direct = DirectExtractor(self.llm, self.tools[0]) if mode == "direct" else None
 
     def _load_data(self) -> pd.DataFrame:
         """Load and validate input data."""
+        if not isinstance(self.data_source, pd.DataFrame):
+            # Read only the needed columns, and stop after num_rows rows
+            return DataLoader.load_for_template(
+                self.data_source,
+                self.query_template,
+                num_rows=self.num_rows,
+                include_columns=self.include_columns,
+            )
+
         df = self.data_source
 
         # Validate that all placeholders in template have corresponding columns
@@ -46,57 +116,263 @@ class WebSearchPipeline:
 
         return df
 
+    def _search_row(self, i: int, total: int, query: str) -> Dict[str, Any]:
+        """
+        Run the agent for a single row, capturing any error as the row result.
+
+        Args:
+            i: 1-based row number
+            total: Total number of rows in the run
+            query: Rendered query for the row
+
+        Returns:
+            Dict containing the agent response or an error output
+        """
+        if self.cancel_event.is_set():
+            return {"output": "Cancelled", "error": "cancelled"}
+
+        handler = MetricsCallbackHandler(self.metrics)
+        try:
+            print(f"Processing row {i}/{total}: {query}")
+            with handler.track():
+                result = self._search(i, query, [handler])
+        except Exception as e:
+            print(f"Error processing row {i}: {e}")
+            result = {"output": f"Error: {str(e)}", "error": str(e)}
+        result["metrics"] = handler.row_metrics(error="error" in result)
+
+        # Rate limiting, applied per worker so each one keeps the same spacing
+        if i < total and self.rate_limit:  # Don't wait after the last query
+            time.sleep(self.rate_limit)
+
+        return result
+
+    def _search_batch(self, start: int, total: int, queries: List[str]) -> List[Dict[str, Any]]:
+        """
+        Search a batch of distinct queries, extracting their answers with one
+        LLM call. Rows missing from the batched reply are retried one by one.
+
+        Args:
+            start: 1-based row number of the first query
+            total: Total number of rows in the run
+            queries: Rendered queries of the batch
+
+        Returns:
+            List of results, one per query
+        """
+        if len(queries) == 1:
+            return [self._search_row(start, total, queries[0])]
+        if self.cancel_event.is_set():
+            return [{"output": "Cancelled", "error": "cancelled"} for _ in queries]
+
+        print(f"Processing rows {start}-{start + len(queries) - 1}/{total} as one batch")
+        handler = MetricsCallbackHandler(self.metrics)
+        try:
+            with handler.track():
+                answers = self.direct.search_batch(queries, [handler])
+        except Exception as e:
+            print(f"Batched extraction failed for rows {start}-{start + len(queries) - 1}: {e}")
+            answers = [None] * len(queries)
+        answered = [answer for answer in answers if answer is not None]
+        batch_metrics = handler.row_metrics(rows=len(answered))
+        for answer in answered:
+            answer["metrics"] = {**batch_metrics, "batch_rows": len(queries)}
+
+        missing = sum(answer is None for answer in answers)
+        if missing:
+            print(f"Retrying {missing} rows of the batch individually")
+        return [
+            answer if answer is not None else self._search_row(start + k, total, query)
+            for k, (query, answer) in enumerate(zip(queries, answers))
+        ]
+
+    def _search(self, i: int, query: str, callbacks: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """Search with the direct plan if enabled, falling back to the agent."""
+        if self.direct is None:
+            return self.agent.search(query, callbacks)
+
+        try:
+            return self.direct.search(query, callbacks)
+        except Exception as e:
+            print(f"Direct extraction failed for row {i} ({e}); falling back to the agent")
+        result = self.agent.search(query, callbacks)
+        result["mode"] = "agent_fallback"
+        return result
+
+    def _record_row(
+        self,
+        j: int,
+        query: str,
+        result: Dict[str, Any],
+        results: List[Optional[Dict[str, Any]]],
+        sink=None,
+    ) -> None:
+        """Store a finished row in memory, or write it to the streaming sink."""
+        if sink is None:
+            results[j] = result
+        else:
+            sink.write(j, ResultHandler.create_sink_row(self.df.iloc[j].to_dict(), query, result))
+        if self.on_row_complete is not None:
+            self.on_row_complete(j, query, result)
+
     def run(self, save_intermediate: bool = True) -> pd.DataFrame:
         """
         Execute the web search pipeline.
 
+        Rows are searched by a pool of ``max_concurrency`` worker threads.
+        Rows that render to the same query share a single search; results are
+        always returned in input row order. Each finished row is appended to
+        the run journal, and with ``resume`` rows already in the journal are
+        not searched again.
+
         Args:
-            save_intermediate: Whether to save intermediate results
+            save_intermediate: Whether to journal rows as they finish
 
         Returns:
-            pd.DataFrame: Results DataFrame
+            pd.DataFrame: Results DataFrame, and the list of agent results
+            (empty when ``stream_output`` is set, to keep memory flat)
         """
-        print(f"Starting web search for {len(self.df)} rows...")
-
-        # Generate queries for each row
-        queries = QueryGenerator.generate_queries(self.query_template, self.df)
-        results = []
-
-        # Execute searches with progress tracking
-        for i, query in enumerate(queries, 1):
-            try:
-                print(f"Processing row {i}/{len(queries)}: {query}")
-                result = self.agent.search(query)
-                results.append(result)
-
-                # Save intermediate results
-                if save_intermediate and i % 5 == 0:  # Save every 5 rows
-                    intermediate_df = ResultHandler.create_results_dataframe(
-                        self.df.iloc[:i],
-                        queries[:i],
-                        results
-                    )
-                    intermediate_path = f"intermediate_results_{i}.csv"
-                    ResultHandler.save_results(intermediate_df, intermediate_path)
-                    print(f"Saved intermediate results to {intermediate_path}")
-
-                # Rate limiting
-                if i < len(queries):  # Don't wait after the last query
-                    time.sleep(self.rate_limit)
-
-            except Exception as e:
-                print(f"Error processing row {i}: {e}")
-                results.append({"output": f"Error: {str(e)}"})
-
-        # Create final results DataFrame
-        result_df = ResultHandler.create_results_dataframe(
-            self.df,
-            queries,
-            results
-        )
+        # Aggregates for this run; every sample also reaches the process-wide recorder
+        self.metrics = MetricsRecorder(parent=MetricsRecorder.shared())
+        print(f"Starting web search for {len(self.df)} rows "
+              f"(concurrency: {self.max_concurrency})...")
+
+        sink = ResultHandler.open_sink(self.output_path) if self.stream_output else None
+        journal = RunJournal(self.journal_path)
+        journaled = journal.load() if self.resume else {}
+        if journaled:
+            print(f"Resuming from {self.journal_path} ({len(journaled)} rows already done)")
+        if save_intermediate:
+            journal.open(resume=self.resume)
+
+        # Execute searches with progress tracking; each task gets its own copy
+        # of the context so the tool cache mode reaches the worker threads
+        with journal, ToolCache.use_mode(self.cache_mode), \
+                ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            # Queries are rendered in chunks and submitted as they are produced,
+            # so the first searches start before the whole input is rendered.
+            # Rows that render to the same query share a single search.
+            queries: List[str] = []
+            restored: Dict[int, Dict[str, Any]] = {}
+            restored_by_query: Dict[Any, Dict[str, Any]] = {}
+            rows_by_query: Dict[Any, List[int]] = {}
+            # Each future searches a batch of distinct queries and maps to the
+            # rows of each query
+            futures: Dict[Any, List[List[int]]] = {}
+            batch: List[Any] = []  # (query, rows) pairs waiting to be submitted
+            submitted = 0
+
+            def submit(pending: List[Any]) -> None:
+                nonlocal submitted
+                future = executor.submit(
+                    copy_context().run, self._search_batch, submitted + 1, len(self.df),
+                    [query for query, _ in pending]
+                )
+                futures[future] = [rows for _, rows in pending]
+                submitted += len(pending)
+
+            for chunk in QueryGenerator.iter_queries(self.query_template, self.df):
+                for query in chunk:
+                    j = len(queries)
+                    queries.append(query)
+                    key = query if self.deduplicate else j
+
+                    record = journaled.get(j)
+                    if record is not None and record["query_hash"] == RunJournal.query_hash(query):
+                        restored[j] = restored_by_query[key] = record["result"]
+                        continue
+                    if key in restored_by_query:
+                        restored[j] = restored_by_query[key]
+                        if journal.file is not None:
+                            journal.append(j, query, restored[j])
+                        continue
+
+                    if key in rows_by_query:
+                        rows_by_query[key].append(j)
+                        continue
+                    rows_by_query[key] = [j]
+                    batch.append((query, rows_by_query[key]))
+                    if len(batch) == self.batch_size:
+                        submit(batch)
+                        batch = []
+            if batch:
+                submit(batch)
+
+            # With stream_output, rows go straight to the sink and are not kept
+            results: List[Optional[Dict[str, Any]]] = [None] * (0 if sink else len(queries))
+            for j, result in restored.items():
+                self._record_row(j, queries[j], result, results, sink)
+
+            searched_rows = len(queries) - len(restored)
+            self.summary = {
+                "rows": len(queries),
+                "resumed_rows": len(restored),
+                "distinct_queries": submitted,
+                "deduplicated_rows": searched_rows - submitted,
+            }
+            if self.summary["deduplicated_rows"]:
+                print(f"Deduplicated {self.summary['deduplicated_rows']} rows "
+                      f"into {submitted} distinct queries")
+
+            modes = {"direct": 0, "batch": 0, "agent_fallback": 0}
+            stopped_early = 0
+            for future in as_completed(futures):
+                if self.cancel_event.is_set():
+                    break
+                for result, rows in zip(future.result(), futures[future]):
+                    if result.get("mode") in modes:
+                        modes[result["mode"]] += 1
+                    if result.get("stopped_early"):
+                        stopped_early += 1
+                        self.metrics.increment("agent_early_stops_total")
+                    for j in rows:
+                        self.metrics.increment("rows_total")
+                        self._record_row(j, queries[j], result, results, sink)
+                        # Journal each row as soon as it finishes; failed rows are
+                        # left out so a resumed run retries them
+                        if journal.file is not None and "error" not in result:
+                            journal.append(j, queries[j], result)
+
+            if stopped_early:
+                self.summary["stopped_early_queries"] = stopped_early
+            if self.direct is not None:
+                self.summary["direct_queries"] = modes["direct"]
+                self.summary["fallback_queries"] = modes["agent_fallback"]
+                if self.batch_size > 1:
+                    self.summary["batched_queries"] = modes["batch"]
+
+            if self.cancel_event.is_set():
+                # Drop searches that have not started; rows without a result
+                # are marked as cancelled below
+                for future in futures:
+                    future.cancel()
+                self.summary["cancelled"] = True
+                print("Run cancelled")
+
+        if self.cancel_event.is_set() and sink is None:
+            results = [result or {"output": "Cancelled", "error": "cancelled"} for result in results]
+
+        if sink is not None:
+            # Rows are already on disk; only the result columns are read back
+            sink.close()
+            result_df = ResultHandler.assemble_from_sink(self.df, sink)
+        else:
+            # Create final results DataFrame
+            result_df = ResultHandler.create_results_dataframe(
+                self.df,
+                queries,
+                results
+            )
 
-        # Save final results
-        ResultHandler.save_results(result_df, self.output_path)
+            # Save final results
+            ResultHandler.save_results(result_df, self.output_path)
         print(f"Search completed. Results saved to {self.output_path}")
+        print(f"Run summary: {self.summary}")
+        self.summary["metrics"] = self.metrics.summary()
+        print(f"Metrics: {self.summary['metrics']}")
+        if self.cache_mode != "bypass":
+            print(f"Tool cache: {ToolCache.stats()}")
+        if self.llm_cache:
+            print(f"LLM cache: {LLMCache.shared().stats()}")
 
         return result_df,results
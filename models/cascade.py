@@ -0,0 +1,135 @@
+import json
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain.agents.output_parsers import ReActSingleInputOutputParser
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import PrivateAttr
+
+from utils.metrics import MetricsCallbackHandler, MetricsRecorder
+
+
+def validate_response(prompt: str, text: str) -> bool:
+    """
+    Check that a model answered in the form its prompt asks for.
+
+    - ReAct prompts (``SearchAgent``) need a parseable Action or Final Answer.
+    - Batched extraction prompts (``DirectExtractor``) need a JSON object.
+    - Any other prompt needs a non-empty answer.
+
+    Args:
+        prompt: Prompt text sent to the model
+        text: Model output
+
+    Returns:
+        bool: Whether the output can be used
+    """
+    if not text.strip():
+        return False
+    if prompt.rstrip().endswith("JSON:"):
+        start, end = text.find("{"), text.rfind("}")
+        try:
+            return start != -1 and isinstance(json.loads(text[start:end + 1]), dict)
+        except ValueError:
+            return False
+    if "Action Input:" in prompt and "Begin!" in prompt:
+        try:
+            ReActSingleInputOutputParser().parse(text)
+        except Exception:
+            return False
+    return True
+
+
+class CascadeChatModel(BaseChatModel):
+    """
+    Chat model that tries cheap, fast models first and escalates on failure.
+
+    Each call goes to the first tier. If the tier raises or its answer fails
+    ``validator``, the same messages go to the next tier, up to the last one,
+    whose answer is returned as is. Every tier keeps its own rate limiter,
+    rate-limit callbacks and cache.
+
+    Per-tier outcomes are counted in ``cascade_calls_total{tier,outcome}``,
+    where outcome is 'accepted', 'invalid' or 'error', and in ``stats()``.
+    Token usage of the returned message adds up every attempt.
+    """
+
+    tiers: List[BaseChatModel]
+    tier_names: List[str]
+    validator: Callable[[str, str], bool] = validate_response
+
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _counts: Dict[str, Dict[str, int]] = PrivateAttr(default_factory=dict)
+
+    @property
+    def _llm_type(self) -> str:
+        return "cascade"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"tiers": self.tier_names}
+
+    def _count(self, tier: str, outcome: str) -> None:
+        with self._lock:
+            counts = self._counts.setdefault(tier, {"accepted": 0, "invalid": 0, "error": 0})
+            counts[outcome] += 1
+        handler = MetricsCallbackHandler.current()
+        recorder = handler.recorder if handler is not None else MetricsRecorder.shared()
+        recorder.increment("cascade_calls_total", tier=tier, outcome=outcome)
+
+    @staticmethod
+    def _add_usage(messages: List[AIMessage]) -> Optional[Dict[str, int]]:
+        usages = [m.usage_metadata for m in messages if getattr(m, "usage_metadata", None)]
+        if not usages:
+            return None
+        return {
+            key: sum(usage.get(key, 0) for usage in usages)
+            for key in ("input_tokens", "output_tokens", "total_tokens")
+        }
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        prompt = "\n".join(str(message.content) for message in messages)
+        attempts: List[AIMessage] = []
+        for k, (name, tier) in enumerate(zip(self.tier_names, self.tiers)):
+            last = k == len(self.tiers) - 1
+            try:
+                message = tier.invoke(messages, stop=stop, **kwargs)
+            except Exception as e:
+                self._count(name, "error")
+                if last:
+                    raise
+                print(f"Cascade tier {name} failed ({e}); escalating")
+                continue
+
+            attempts.append(message)
+            valid = self.validator(prompt, str(message.content))
+            self._count(name, "accepted" if valid else "invalid")
+            if valid or last:
+                response = AIMessage(
+                    content=message.content,
+                    response_metadata={**message.response_metadata, "cascade_tier": name},
+                    usage_metadata=CascadeChatModel._add_usage(attempts),
+                )
+                return ChatResult(generations=[ChatGeneration(message=response)])
+        raise ValueError("CascadeChatModel needs at least one tier")
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return calls, outcomes and the share of calls answered per tier."""
+        with self._lock:
+            counts = {tier: dict(outcomes) for tier, outcomes in self._counts.items()}
+        return {
+            tier: {
+                **outcomes,
+                "calls": sum(outcomes.values()),
+                "hit_rate": round(outcomes["accepted"] / sum(outcomes.values()), 4),
+            }
+            for tier, outcomes in counts.items()
+        }
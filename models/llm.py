@@ -1,28 +1,70 @@
-from langchain_groq import ChatGroq
-from langchain_google_genai import ChatGoogleGenerativeAI
 from config.settings import DEFAULT_MODEL, DEFAULT_TEMPERATURE
-from config.settings import GROQ_MODEL_LIST, GOOGLE_MODEL_LIST
+from config.settings import GROQ_MODEL_LIST, GOOGLE_MODEL_LIST, CASCADE_MODELS
+from typing import List
+from utils.rate_limiter import LLMRateLimiter, RateLimitCallbackHandler
+from utils.cache import LLMCache
 
 class LLMFactory:
     @staticmethod
-    def create_llm(model_name: str = DEFAULT_MODEL, temperature: float = DEFAULT_TEMPERATURE):
+    def get_provider(model_name: str) -> str:
+        """Return the provider key used for rate limiting a model."""
+        return "google" if model_name in GOOGLE_MODEL_LIST else "groq"
+
+    @staticmethod
+    def create_llm(model_name: str = DEFAULT_MODEL, temperature: float = DEFAULT_TEMPERATURE, cache: bool = False):
         """
         Create an LLM instance based on the model name.
         
         Args:
-            model_name: Name of the model to use
+            model_name: Name of the model to use, or of a cascade in CASCADE_MODELS
             temperature: Temperature parameter for the model
+            cache: Whether to serve identical calls from the persistent LLM cache
             
         Returns:
             LLM instance
         """
+        if model_name in CASCADE_MODELS:
+            return LLMFactory.create_cascade(CASCADE_MODELS[model_name], temperature, cache)
+
+        provider = LLMFactory.get_provider(model_name)
+        options = {
+            "callbacks": [RateLimitCallbackHandler(provider)],
+            "rate_limiter": LLMRateLimiter(provider),
+            "cache": LLMCache.shared() if cache else None,
+        }
+        # Provider SDKs are imported on first use to keep startup fast
         if model_name in GOOGLE_MODEL_LIST:
+            from langchain_google_genai import ChatGoogleGenerativeAI
             return ChatGoogleGenerativeAI(
                 model=model_name,
-                temperature=temperature
+                temperature=temperature,
+                **options
             )
         else:
+            from langchain_groq import ChatGroq
             return ChatGroq(
                 model=model_name,
-                temperature=temperature
-            )
\ No newline at end of file
+                temperature=temperature,
+                **options
+            )
+
+    @staticmethod
+    def create_cascade(model_names: List[str], temperature: float = DEFAULT_TEMPERATURE, cache: bool = False):
+        """
+        Create a model that tries each model in turn until one answers validly.
+
+        Args:
+            model_names: Models from GROQ_MODEL_LIST or GOOGLE_MODEL_LIST, cheapest first
+            temperature: Temperature parameter for every tier
+            cache: Whether each tier serves identical calls from the persistent LLM cache
+
+        Returns:
+            CascadeChatModel instance
+        """
+        from models.cascade import CascadeChatModel
+        if not model_names:
+            raise ValueError("A cascade needs at least one model")
+        return CascadeChatModel(
+            tiers=[LLMFactory.create_llm(name, temperature, cache=cache) for name in model_names],
+            tier_names=list(model_names),
+        )
@@ -0,0 +1,302 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from langchain_core.caches import BaseCache
+from langchain_core.messages import message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, Generation
+
+from config.settings import TOOL_CACHE_PATH, TOOL_CACHE_TTL, TOOL_CACHE_MAX_ENTRIES
+from config.settings import LLM_CACHE_PATH, LLM_CACHE_TTL, LLM_CACHE_MAX_ENTRIES
+
+
+class DiskCache:
+    """
+    SQLite-backed key/value store with TTL expiry and LRU eviction.
+
+    Several caches can share one database file by using different
+    namespaces; TTL and size bounds apply per namespace.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        namespace: str,
+        ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+    ):
+        self.path = path
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "namespace TEXT, key TEXT, value TEXT, created REAL, accessed REAL, "
+                "PRIMARY KEY (namespace, key))"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS cache_accessed ON cache (namespace, accessed)"
+            )
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        Look up a key, refreshing its LRU position on a hit.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Tuple[bool, Any]: Whether the key was found, and its value
+        """
+        now = time.time()
+        with self.lock, self.conn:
+            row = self.conn.execute(
+                "SELECT value, created FROM cache WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+            if row is not None and self.ttl is not None and now - row[1] > self.ttl:
+                self.conn.execute(
+                    "DELETE FROM cache WHERE namespace = ? AND key = ?",
+                    (self.namespace, key),
+                )
+                row = None
+            if row is None:
+                self.misses += 1
+                return False, None
+            self.conn.execute(
+                "UPDATE cache SET accessed = ? WHERE namespace = ? AND key = ?",
+                (now, self.namespace, key),
+            )
+            self.hits += 1
+        return True, json.loads(row[0])
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store a JSON-serializable value and evict the least recently used
+        entries beyond ``max_entries``.
+
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        now = time.time()
+        payload = json.dumps(value, default=str)
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, key, payload, now, now),
+            )
+            if self.max_entries is not None:
+                self.conn.execute(
+                    "DELETE FROM cache WHERE namespace = ? AND key IN ("
+                    "SELECT key FROM cache WHERE namespace = ? "
+                    "ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                    (self.namespace, self.namespace, self.max_entries),
+                )
+
+    def clear(self) -> None:
+        """Remove every entry in this namespace."""
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and the current entry count."""
+        with self.lock:
+            size = self.conn.execute(
+                "SELECT COUNT(*) FROM cache WHERE namespace = ?", (self.namespace,)
+            ).fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "entries": size}
+
+
+class ToolCache:
+    """
+    Cache of search tool observations keyed by tool name and normalized query.
+
+    The cache mode is held in a context variable so each pipeline run can
+    choose its own behaviour:
+
+    - ``use``: serve hits from the cache and store misses
+    - ``refresh``: always call the tool and overwrite the cached value
+    - ``bypass``: call the tool without reading or writing the cache
+    """
+
+    MODES = ("use", "refresh", "bypass")
+    mode: ContextVar = ContextVar("tool_cache_mode", default="use")
+    _store: Optional[DiskCache] = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def store() -> DiskCache:
+        """Return the shared tool cache, opening it on first use."""
+        with ToolCache._lock:
+            if ToolCache._store is None:
+                ToolCache._store = DiskCache(
+                    TOOL_CACHE_PATH,
+                    namespace="tools",
+                    ttl=TOOL_CACHE_TTL,
+                    max_entries=TOOL_CACHE_MAX_ENTRIES,
+                )
+            return ToolCache._store
+
+    @staticmethod
+    def normalize_query(query: Any) -> str:
+        """Lower-case a query and collapse whitespace."""
+        return " ".join(str(query).lower().split())
+
+    # repr() of an exception, which some tool wrappers return instead of raising
+    _ERROR_RESULT = re.compile(r"^\s*[\w.]*(Error|Exception)\(")
+
+    @staticmethod
+    def is_error_result(value: Any) -> bool:
+        """Return True if a tool returned an error message in place of results."""
+        return isinstance(value, str) and bool(ToolCache._ERROR_RESULT.match(value))
+
+    @staticmethod
+    def fetch(tool_name: str, query: Any, compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached observation for a tool call, computing it on a miss.
+
+        Args:
+            tool_name: Name of the tool the observation belongs to
+            query: Query passed to the tool
+            compute: Zero-argument callable that performs the real call
+
+        Returns:
+            Any: Tool observation; error results are returned but not stored
+        """
+        mode = ToolCache.mode.get()
+        if mode == "bypass":
+            return compute()
+
+        store = ToolCache.store()
+        key = f"{tool_name}\x00{ToolCache.normalize_query(query)}"
+        if mode == "use":
+            found, value = store.get(key)
+            if found:
+                return value
+
+        value = compute()
+        if not ToolCache.is_error_result(value):
+            store.set(key, value)
+        return value
+
+    @staticmethod
+    def wrap(tool_name: str, func: Callable[[str], Any]) -> Callable[[str], Any]:
+        """
+        Wrap a single-input tool function with the cache.
+
+        Args:
+            tool_name: Name used in the cache key
+            func: Tool function taking the query string
+
+        Returns:
+            Callable: Cached tool function
+        """
+        @wraps(func)
+        def cached(query: str, *args, **kwargs):
+            return ToolCache.fetch(tool_name, query, lambda: func(query, *args, **kwargs))
+
+        return cached
+
+    @staticmethod
+    @contextmanager
+    def use_mode(mode: str):
+        """
+        Set the cache mode for the current context.
+
+        Args:
+            mode: One of 'use', 'refresh' or 'bypass'
+        """
+        if mode not in ToolCache.MODES:
+            raise ValueError(f"Unsupported cache mode '{mode}'. Use one of {ToolCache.MODES}")
+        token = ToolCache.mode.set(mode)
+        try:
+            yield
+        finally:
+            ToolCache.mode.reset(token)
+
+    @staticmethod
+    def stats() -> Dict[str, int]:
+        """Return hit/miss counters of the shared tool cache."""
+        return ToolCache.store().stats()
+
+
+class LLMCache(BaseCache):
+    """
+    Persistent LangChain cache for LLM completions.
+
+    Entries are keyed on a hash of the serialized prompt and LangChain's
+    ``llm_string``, which carries the model name, temperature and stop
+    sequences, so only identical calls are served from the cache.
+    """
+
+    _shared: Optional["LLMCache"] = None
+    _lock = threading.Lock()
+
+    def __init__(self, store: DiskCache):
+        self.store = store
+
+    @staticmethod
+    def shared() -> "LLMCache":
+        """Return the process-wide LLM cache, opening it on first use."""
+        with LLMCache._lock:
+            if LLMCache._shared is None:
+                LLMCache._shared = LLMCache(DiskCache(
+                    LLM_CACHE_PATH,
+                    namespace="llm",
+                    ttl=LLM_CACHE_TTL,
+                    max_entries=LLM_CACHE_MAX_ENTRIES,
+                ))
+            return LLMCache._shared
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\x00{prompt}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _encode(generation: Generation) -> Dict[str, Any]:
+        if isinstance(generation, ChatGeneration):
+            return {"message": message_to_dict(generation.message)}
+        return {"text": generation.text}
+
+    @staticmethod
+    def _decode(value: Dict[str, Any]) -> Generation:
+        if "message" in value:
+            return ChatGeneration(message=messages_from_dict([value["message"]])[0])
+        return Generation(text=value["text"])
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        found, value = self.store.get(self._key(prompt, llm_string))
+        if not found:
+            return None
+        return [self._decode(generation) for generation in value]
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        self.store.set(
+            self._key(prompt, llm_string),
+            [self._encode(generation) for generation in return_val],
+        )
+
+    def clear(self, **kwargs: Any) -> None:
+        self.store.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters of the LLM cache."""
+        return self.store.stats()
@@ -0,0 +1,80 @@
+import threading
+from typing import Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config.settings import (
+    HTTP_POOL_CONNECTIONS,
+    HTTP_POOL_MAXSIZE,
+    HTTP_MAX_RETRIES,
+    HTTP_TIMEOUT,
+)
+
+
+class HttpSessions:
+    """
+    Pooled, keep-alive HTTP sessions shared by the search tools.
+
+    Each backend gets its own ``requests.Session`` so that per-client headers
+    (such as API keys) never leak to other hosts, while every session uses the
+    same pool limits, retries and timeout from config/settings.py.
+    """
+
+    _sessions: Dict[str, requests.Session] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def create_session() -> requests.Session:
+        """Build a session with a bounded keep-alive connection pool."""
+        # Connection errors are retried for any method, since nothing was sent.
+        # 5xx responses and read errors are only retried for idempotent
+        # methods: a retried POST to Tavily or Serper is another paid request
+        # that never went through the rate limiter.
+        retry = Retry(
+            total=HTTP_MAX_RETRIES,
+            backoff_factor=0.5,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=HTTP_POOL_CONNECTIONS,
+            pool_maxsize=HTTP_POOL_MAXSIZE,
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    @staticmethod
+    def get(name: str) -> requests.Session:
+        """
+        Return the shared session for a backend, creating it on first use.
+
+        Args:
+            name: Backend key, e.g. 'tavily' or 'serper'
+
+        Returns:
+            requests.Session: Pooled session
+        """
+        with HttpSessions._lock:
+            session = HttpSessions._sessions.get(name)
+            if session is None:
+                session = HttpSessions.create_session()
+                HttpSessions._sessions[name] = session
+            return session
+
+    @staticmethod
+    def timeout():
+        """Return the (connect, read) timeout for outgoing requests."""
+        return HTTP_TIMEOUT
+
+    @staticmethod
+    def close_all() -> None:
+        """Close every pooled session."""
+        with HttpSessions._lock:
+            for session in HttpSessions._sessions.values():
+                session.close()
+            HttpSessions._sessions.clear()
@@ -0,0 +1,247 @@
+import json
+import os
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from config.settings import JOB_MAX_FINISHED, JOB_MAX_WORKERS, JOB_RETENTION_SECONDS
+from utils.result_handler import ResultHandler
+
+
+class Job:
+    """
+    State of one background pipeline run.
+
+    Finished rows are kept in memory without their agent trace. Traces are
+    appended to a JSONL file next to the job's output and read back by byte
+    offset only when a client asks for them.
+    """
+
+    def __init__(self, job_id: str):
+        self.id = job_id
+        self.status = "queued"  # queued | running | completed | failed | cancelled
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.total_rows: Optional[int] = None
+        self.error: Optional[str] = None
+        self.summary: Dict[str, Any] = {}
+        self.output_path: Optional[str] = None
+        self.trace_path: Optional[str] = None
+        self._trace_file = None
+        self.cancel_event = threading.Event()
+        # Called once the job is over, e.g. to return a pooled agent
+        self.cleanup: List[Callable[[], None]] = []
+        self.lock = threading.Lock()
+        # Finished rows in completion order; SSE clients read them by offset
+        self.events: List[Dict[str, Any]] = []
+        # Byte offset of each row's trace in the trace file
+        self.trace_offsets: List[int] = []
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("completed", "failed", "cancelled")
+
+    @property
+    def completed_rows(self) -> int:
+        with self.lock:
+            return len(self.events)
+
+    def add_row(self, row: int, query: str, result: Dict[str, Any]) -> None:
+        """Record a finished row, writing its trace to the trace file."""
+        event = {
+            "row": row,
+            "generated_query": query,
+            "search_result": ResultHandler.process_agent_response(result),
+        }
+        line = (json.dumps(ResultHandler.serialize_result(result), default=str) + "\n").encode("utf-8")
+        with self.lock:
+            if self._trace_file is None:
+                self._trace_file = open(self.trace_path, "ab")
+            offset = self._trace_file.tell()
+            self._trace_file.write(line)
+            self._trace_file.flush()
+            self.events.append(event)
+            self.trace_offsets.append(offset)
+
+    def rows_since(self, offset: int, limit: Optional[int] = None, view: str = "trace") -> List[Dict[str, Any]]:
+        """
+        Return rows finished after the first ``offset`` ones.
+
+        Args:
+            offset: Rows to skip
+            limit: Most rows returned (all if None)
+            view: 'trace' adds each row's serialized agent result as 'result'
+
+        Returns:
+            List[Dict[str, Any]]: Rows in completion order
+        """
+        end = None if limit is None else offset + limit
+        with self.lock:
+            rows = self.events[offset:end]
+            offsets = self.trace_offsets[offset:end]
+        if view != "trace" or not rows:
+            return rows
+        try:
+            with open(self.trace_path, "rb") as f:
+                traced = []
+                for row, position in zip(rows, offsets):
+                    f.seek(position)
+                    traced.append({**row, "result": json.loads(f.readline())})
+                return traced
+        except OSError:
+            # The job expired while its rows were being read
+            return rows
+
+    def close_trace(self) -> None:
+        """Close the trace file once no more rows will be added."""
+        with self.lock:
+            if self._trace_file is not None:
+                self._trace_file.close()
+                self._trace_file = None
+
+    def discard(self) -> None:
+        """Free the recorded rows and delete the job's output and trace files."""
+        self.close_trace()
+        # Clients still following the job see it as over with no rows left
+        with self.lock:
+            self.events = []
+            self.trace_offsets = []
+        for path in (self.output_path, self.trace_path):
+            if path is not None and os.path.exists(path):
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    print(f"Could not remove {path}: {e}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the job status as plain data."""
+        completed_rows = self.completed_rows
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "total_rows": self.total_rows,
+            "completed_rows": completed_rows,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "error": self.error,
+            "summary": self.summary,
+        }
+
+
+class JobManager:
+    """
+    Runs pipelines on a bounded pool of worker threads, off the event loop.
+
+    ``submit`` takes a factory that builds a ``WebSearchPipeline`` for a job;
+    the factory receives the job so it can hook the pipeline's row callback
+    and cancel event to it.
+
+    Finished jobs are kept for ``retention`` seconds, and at most
+    ``max_finished`` of them; expired jobs are forgotten, their rows freed
+    and their output and trace files deleted.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = JOB_MAX_WORKERS,
+        retention: Optional[float] = JOB_RETENTION_SECONDS,
+        max_finished: Optional[int] = JOB_MAX_FINISHED,
+    ):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self.jobs: Dict[str, Job] = {}
+        self.lock = threading.Lock()
+        self.retention = retention
+        self.max_finished = max_finished
+
+    def submit(self, build_pipeline: Callable[[Job], Any]) -> Job:
+        """
+        Queue a pipeline run.
+
+        Args:
+            build_pipeline: Callable returning a configured pipeline for the job
+
+        Returns:
+            Job: The queued job
+        """
+        job = Job(uuid.uuid4().hex)
+        with self.lock:
+            self._expire()
+            self.jobs[job.id] = job
+        self.executor.submit(self._run, job, build_pipeline)
+        return job
+
+    def _run(self, job: Job, build_pipeline: Callable[[Job], Any]) -> None:
+        if job.cancel_event.is_set():
+            job.status = "cancelled"
+            job.finished = time.time()
+            return
+
+        job.status = "running"
+        job.started = time.time()
+        try:
+            pipeline = build_pipeline(job)
+            job.total_rows = len(pipeline.df)
+            job.output_path = pipeline.output_path
+            job.trace_path = f"{os.path.splitext(pipeline.output_path)[0]}.trace.jsonl"
+            # Jobs are never resumed and keep their own traces, so they are not journaled
+            pipeline.run(save_intermediate=False)
+            job.summary = pipeline.summary
+            job.status = "cancelled" if job.cancel_event.is_set() else "completed"
+        except Exception as e:
+            traceback.print_exc()
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.close_trace()
+            for cleanup in job.cleanup:
+                try:
+                    cleanup()
+                except Exception:
+                    traceback.print_exc()
+            job.finished = time.time()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Return a job by id, or None if unknown or expired."""
+        with self.lock:
+            self._expire()
+            return self.jobs.get(job_id)
+
+    def _expire(self) -> None:
+        """Drop finished jobs past the retention time or beyond ``max_finished``. Caller holds the lock."""
+        finished = sorted(
+            (job for job in self.jobs.values() if job.done and job.finished is not None),
+            key=lambda job: job.finished,
+        )
+        expired = []
+        if self.retention is not None:
+            oldest = time.time() - self.retention
+            expired += [job for job in finished if job.finished < oldest]
+        if self.max_finished is not None:
+            expired += finished[:max(0, len(finished) - self.max_finished)]
+        for job in expired:
+            if self.jobs.pop(job.id, None) is not None:
+                job.discard()
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Request cancellation of a job. Rows already being searched finish;
+        rows not yet started are skipped.
+
+        Args:
+            job_id: Id of the job to cancel
+
+        Returns:
+            Optional[Job]: The job, or None if unknown
+        """
+        job = self.get(job_id)
+        if job is not None and not job.done:
+            job.cancel_event.set()
+            if job.status == "queued":
+                job.status = "cancelled"
+                job.finished = time.time()
+        return job
@@ -0,0 +1,251 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from config.settings import (
+    KNOWLEDGE_INDEX_PATH,
+    KNOWLEDGE_MAX_AGE,
+    KNOWLEDGE_MAX_PASSAGES,
+    KNOWLEDGE_MIN_TERM_MATCH,
+    KNOWLEDGE_RESULT_LIMIT,
+)
+from utils.cache import ToolCache
+from utils.metrics import MetricsCallbackHandler, MetricsRecorder
+from utils.observation_compressor import ObservationCompressor
+
+_WORD = re.compile(r"\w+")
+# Words that say nothing about what a query is looking for
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "get", "give",
+    "how", "i", "in", "is", "it", "me", "of", "on", "or", "the", "to", "what",
+    "when", "where", "which", "who", "with",
+}
+
+
+class KnowledgeIndex:
+    """
+    On-disk full-text index of passages returned by the search tools.
+
+    Every real tool call adds its passages, tagged with source URL, tool,
+    query and fetch time, to a SQLite FTS5 table. Passages seen again get
+    their fetch time refreshed instead of being stored twice. Lookups rank
+    passages with FTS5's BM25 and skip those older than ``max_age``, so
+    recurring enrichment jobs can answer from earlier searches locally.
+    """
+
+    _shared: Optional["KnowledgeIndex"] = None
+    _lock = threading.Lock()
+
+    def __init__(self, path: str, max_passages: Optional[int] = KNOWLEDGE_MAX_PASSAGES):
+        self.path = path
+        self.max_passages = max_passages
+        self.inserted = 0
+        self.lock = threading.Lock()
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS passage ("
+                "id INTEGER PRIMARY KEY, digest TEXT UNIQUE, content TEXT, source TEXT, "
+                "tool TEXT, query TEXT, fetched REAL)"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS passage_fetched ON passage (fetched)")
+            self.conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS passage_fts USING fts5("
+                "content, content='passage', content_rowid='id')"
+            )
+
+    @staticmethod
+    def shared() -> "KnowledgeIndex":
+        """Return the index at KNOWLEDGE_INDEX_PATH, opening it on first use."""
+        with KnowledgeIndex._lock:
+            if KnowledgeIndex._shared is None:
+                KnowledgeIndex._shared = KnowledgeIndex(KNOWLEDGE_INDEX_PATH)
+            return KnowledgeIndex._shared
+
+    @staticmethod
+    def _split_source(passage: str):
+        # ObservationCompressor prefixes passages of result dicts with "[url] "
+        match = re.match(r"\[([^\]]*)\] (.*)", passage, re.S)
+        return (match.group(1), match.group(2)) if match else ("", passage)
+
+    def add(self, tool_name: str, query: Any, result: Any) -> int:
+        """
+        Index the passages of a tool result.
+
+        Args:
+            tool_name: Tool that returned the result
+            query: Query the tool was called with
+            result: Raw tool result
+
+        Returns:
+            int: Number of passages not seen before; error results are not indexed
+        """
+        if ToolCache.is_error_result(result):
+            return 0
+        now = time.time()
+        added = 0
+        passages = ObservationCompressor.deduplicate(ObservationCompressor.passages(result))
+        with self.lock, self.conn:
+            for passage in passages:
+                source, content = KnowledgeIndex._split_source(passage)
+                key = " ".join(_WORD.findall(content.lower()))
+                digest = hashlib.sha256(f"{source}\x00{key}".encode("utf-8")).hexdigest()
+                row = self.conn.execute("SELECT id FROM passage WHERE digest = ?", (digest,)).fetchone()
+                if row is not None:
+                    self.conn.execute("UPDATE passage SET fetched = ? WHERE id = ?", (now, row[0]))
+                    continue
+                cursor = self.conn.execute(
+                    "INSERT INTO passage (digest, content, source, tool, query, fetched) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (digest, content, source, tool_name, str(query), now),
+                )
+                self.conn.execute(
+                    "INSERT INTO passage_fts (rowid, content) VALUES (?, ?)", (cursor.lastrowid, content)
+                )
+                added += 1
+
+            self.inserted += added
+            # Pruning scans the table, so only do it every thousand new passages
+            if self.max_passages is not None and added and self.inserted % 1000 < added:
+                self._prune()
+        return added
+
+    def _prune(self) -> None:
+        """Drop the oldest passages beyond ``max_passages``. Caller holds the lock."""
+        stale = self.conn.execute(
+            "SELECT id, content FROM passage ORDER BY fetched DESC LIMIT -1 OFFSET ?",
+            (self.max_passages,),
+        ).fetchall()
+        for passage_id, content in stale:
+            self.conn.execute(
+                "INSERT INTO passage_fts (passage_fts, rowid, content) VALUES ('delete', ?, ?)",
+                (passage_id, content),
+            )
+            self.conn.execute("DELETE FROM passage WHERE id = ?", (passage_id,))
+
+    @staticmethod
+    def _terms(query: str) -> List[str]:
+        terms = [term for term in _WORD.findall(str(query).lower()) if term not in _STOPWORDS]
+        return list(dict.fromkeys(terms))
+
+    def search(
+        self,
+        query: str,
+        limit: int = KNOWLEDGE_RESULT_LIMIT,
+        max_age: Optional[float] = KNOWLEDGE_MAX_AGE,
+        min_term_match: float = KNOWLEDGE_MIN_TERM_MATCH,
+    ) -> List[Dict[str, Any]]:
+        """
+        Find indexed passages relevant to a query.
+
+        Args:
+            query: Search query
+            limit: Most passages returned
+            max_age: Skip passages fetched longer ago than this many seconds
+                (no limit if None)
+            min_term_match: Fraction of the query's terms a passage must contain
+
+        Returns:
+            List[Dict[str, Any]]: Best passages first, with 'content',
+            'source', 'tool', 'query' and 'fetched'
+        """
+        terms = KnowledgeIndex._terms(query)
+        if not terms:
+            return []
+
+        match = " OR ".join('"' + term + '"' for term in terms)
+        oldest = 0.0 if max_age is None else time.time() - max_age
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT p.content, p.source, p.tool, p.query, p.fetched "
+                "FROM passage_fts JOIN passage p ON p.id = passage_fts.rowid "
+                "WHERE passage_fts MATCH ? AND p.fetched >= ? "
+                "ORDER BY bm25(passage_fts) LIMIT ?",
+                (match, oldest, limit * 5),
+            ).fetchall()
+
+        needed = max(1, round(len(terms) * min_term_match))
+        results = []
+        for content, source, tool_name, original_query, fetched in rows:
+            words = set(_WORD.findall(content.lower()))
+            if sum(1 for term in terms if term in words) >= needed:
+                results.append({
+                    "content": content,
+                    "source": source,
+                    "tool": tool_name,
+                    "query": original_query,
+                    "fetched": fetched,
+                })
+                if len(results) >= limit:
+                    break
+        return results
+
+    def lookup(self, query: str, max_age: Optional[float] = KNOWLEDGE_MAX_AGE) -> str:
+        """
+        Answer a query from the index as tool output.
+
+        Args:
+            query: Search query
+            max_age: Freshness limit in seconds (no limit if None)
+
+        Returns:
+            str: One passage per line with its source and fetch date, or a
+            note that nothing was found
+        """
+        results = self.search(query, max_age=max_age)
+        handler = MetricsCallbackHandler.current()
+        recorder = handler.recorder if handler is not None else MetricsRecorder.shared()
+        recorder.increment("local_knowledge_lookups_total", outcome="hit" if results else "miss")
+        if not results:
+            return f"No local results for '{query}'. Use a web search tool."
+
+        lines = []
+        for result in results:
+            fetched = time.strftime("%Y-%m-%d", time.localtime(result["fetched"]))
+            source = result["source"] or result["tool"]
+            lines.append(f"[{source}, fetched {fetched}] {result['content']}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def wrap(tool_name: str, func: Callable[[str], Any]) -> Callable[[str], Any]:
+        """
+        Wrap a single-input tool function so its results go into the shared index.
+
+        Indexing failures are printed and never fail the tool call.
+
+        Args:
+            tool_name: Tool name stored with the passages
+            func: Tool function taking the query string
+
+        Returns:
+            Callable: Indexing tool function
+        """
+        @wraps(func)
+        def indexed(query: str, *args, **kwargs):
+            result = func(query, *args, **kwargs)
+            KnowledgeIndex.record(tool_name, query, result)
+            return result
+
+        return indexed
+
+    @staticmethod
+    def record(tool_name: str, query: Any, result: Any) -> None:
+        """Add a tool result to the shared index, printing instead of raising on failure."""
+        try:
+            KnowledgeIndex.shared().add(tool_name, query, result)
+        except Exception as e:
+            print(f"Could not index results of {tool_name}: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of indexed passages."""
+        with self.lock:
+            size = self.conn.execute("SELECT COUNT(*) FROM passage").fetchone()[0]
+        return {"passages": size}
@@ -0,0 +1,310 @@
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from config.settings import METRICS_MAX_SAMPLES, METRICS_PREFIX
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class MetricsRecorder:
+    """
+    Thread-safe store of timings and counters.
+
+    Histograms keep their count and sum plus a window of the most recent
+    samples, from which percentiles are computed. Every observation is also
+    passed to ``parent``, so a run's recorder feeds the process-wide one that
+    backs the ``/metrics`` endpoint.
+    """
+
+    QUANTILES = (0.5, 0.95, 0.99)
+    _shared: Optional["MetricsRecorder"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, parent: Optional["MetricsRecorder"] = None, max_samples: int = METRICS_MAX_SAMPLES):
+        self.parent = parent
+        self.max_samples = max_samples
+        self.started = time.time()
+        self.lock = threading.Lock()
+        self.counters: Dict[str, Dict[Labels, float]] = {}
+        self.histograms: Dict[str, Dict[Labels, Dict[str, Any]]] = {}
+
+    @staticmethod
+    def shared() -> "MetricsRecorder":
+        """Return the process-wide recorder, creating it on first use."""
+        with MetricsRecorder._shared_lock:
+            if MetricsRecorder._shared is None:
+                MetricsRecorder._shared = MetricsRecorder()
+            return MetricsRecorder._shared
+
+    @staticmethod
+    def _labels(labels: Dict[str, Any]) -> Labels:
+        return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def increment(self, name: str, amount: float = 1.0, **labels: Any) -> None:
+        """
+        Add to a counter.
+
+        Args:
+            name: Counter name
+            amount: Amount to add
+            **labels: Label values of the series
+        """
+        key = MetricsRecorder._labels(labels)
+        with self.lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + amount
+        if self.parent is not None:
+            self.parent.increment(name, amount, **labels)
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """
+        Record a histogram sample.
+
+        Args:
+            name: Histogram name
+            value: Sample value
+            **labels: Label values of the series
+        """
+        key = MetricsRecorder._labels(labels)
+        with self.lock:
+            series = self.histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = {"count": 0, "sum": 0.0, "samples": deque(maxlen=self.max_samples)}
+            histogram["count"] += 1
+            histogram["sum"] += value
+            histogram["samples"].append(value)
+        if self.parent is not None:
+            self.parent.observe(name, value, **labels)
+
+    @staticmethod
+    def percentile(values: List[float], q: float) -> float:
+        """Return the nearest-rank percentile ``q`` (0-1) of sorted values."""
+        if not values:
+            return 0.0
+        return values[max(0, math.ceil(q * len(values)) - 1)]
+
+    def _histogram_summary(self, histogram: Dict[str, Any]) -> Dict[str, float]:
+        samples: Deque[float] = histogram["samples"]
+        values = sorted(samples)
+        summary = {"count": histogram["count"], "sum": round(histogram["sum"], 6)}
+        for q in self.QUANTILES:
+            summary[f"p{int(q * 100)}"] = round(MetricsRecorder.percentile(values, q), 6)
+        return summary
+
+    @staticmethod
+    def _series_name(name: str, key: Labels) -> str:
+        if not key:
+            return name
+        return name + "{" + ",".join(f"{label}={value}" for label, value in key) + "}"
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Return aggregates as plain data.
+
+        Returns:
+            Dict[str, Any]: Counters, histogram percentiles and row throughput
+        """
+        with self.lock:
+            counters = {
+                MetricsRecorder._series_name(name, key): value
+                for name, series in self.counters.items()
+                for key, value in series.items()
+            }
+            histograms = {
+                MetricsRecorder._series_name(name, key): self._histogram_summary(histogram)
+                for name, series in self.histograms.items()
+                for key, histogram in series.items()
+            }
+            rows = sum(self.counters.get("rows_total", {}).values())
+        elapsed = time.time() - self.started
+        return {
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(rows / elapsed, 3) if elapsed > 0 else 0.0,
+            "counters": counters,
+            "histograms": histograms,
+        }
+
+    @staticmethod
+    def _prometheus_labels(key: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(key) + ([extra] if extra else [])
+        if not pairs:
+            return ""
+        escaped = [(label, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+                   for label, value in pairs]
+        return "{" + ",".join(f'{label}="{value}"' for label, value in escaped) + "}"
+
+    def prometheus_text(self) -> str:
+        """
+        Render all series in the Prometheus text exposition format.
+
+        Histograms are exposed as summaries with p50/p95/p99 quantiles.
+
+        Returns:
+            str: Metrics text
+        """
+        lines = []
+        with self.lock:
+            for name, series in sorted(self.counters.items()):
+                metric = f"{METRICS_PREFIX}_{name}"
+                lines.append(f"# TYPE {metric} counter")
+                for key, value in series.items():
+                    lines.append(f"{metric}{MetricsRecorder._prometheus_labels(key)} {value}")
+            for name, series in sorted(self.histograms.items()):
+                metric = f"{METRICS_PREFIX}_{name}"
+                lines.append(f"# TYPE {metric} summary")
+                for key, histogram in series.items():
+                    values = sorted(histogram["samples"])
+                    for q in self.QUANTILES:
+                        labels = MetricsRecorder._prometheus_labels(key, ("quantile", str(q)))
+                        lines.append(f"{metric}{labels} {MetricsRecorder.percentile(values, q)}")
+                    labels = MetricsRecorder._prometheus_labels(key)
+                    lines.append(f"{metric}_sum{labels} {histogram['sum']}")
+                    lines.append(f"{metric}_count{labels} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """
+    Callback that times the LLM and tool calls of one search.
+
+    Pass it in the ``callbacks`` of a search; it reports every call to the
+    recorder as it ends and keeps per-search totals for ``row_metrics``.
+    Rate-limit waits are charged to it while it is the active handler
+    (see ``MetricsCallbackHandler.track``).
+    """
+
+    _active: ContextVar[Optional["MetricsCallbackHandler"]] = ContextVar("active_metrics", default=None)
+
+    def __init__(self, recorder: MetricsRecorder):
+        self.recorder = recorder
+        self.started = time.perf_counter()
+        self.lock = threading.Lock()
+        self._runs: Dict[UUID, Tuple[float, str]] = {}
+        self.totals = {
+            "llm_calls": 0,
+            "llm_seconds": 0.0,
+            "tokens": 0,
+            "tool_calls": 0,
+            "tool_seconds": 0.0,
+            "iterations": 0,
+            "rate_limit_wait_seconds": 0.0,
+            "errors": 0,
+        }
+
+    def _add(self, **amounts: float) -> None:
+        with self.lock:
+            for name, amount in amounts.items():
+                self.totals[name] += amount
+
+    def _start(self, run_id: UUID, name: str) -> None:
+        with self.lock:
+            self._runs[run_id] = (time.perf_counter(), name)
+
+    def _finish(self, run_id: UUID) -> Tuple[float, str]:
+        with self.lock:
+            started, name = self._runs.pop(run_id, (time.perf_counter(), ""))
+        return time.perf_counter() - started, name
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id, "llm")
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[Any]], *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id, "llm")
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        from utils.rate_limiter import RateLimitCallbackHandler
+
+        elapsed, _ = self._finish(run_id)
+        cached, tokens = RateLimitCallbackHandler.token_usage(response)
+        self.recorder.increment("llm_calls_total", cached=cached)
+        self.recorder.observe("llm_latency_seconds", elapsed, cached=cached)
+        if tokens:
+            self.recorder.observe("llm_tokens", tokens)
+        self._add(llm_calls=1, llm_seconds=elapsed, tokens=tokens or 0)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id)
+        self.recorder.increment("errors_total", kind="llm")
+        self._add(errors=1)
+
+    def on_tool_start(self, serialized: Dict[str, Any], input_str: str, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id, (serialized or {}).get("name") or kwargs.get("name") or "unknown")
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        elapsed, tool = self._finish(run_id)
+        self.recorder.observe("tool_latency_seconds", elapsed, tool=tool)
+        self._add(tool_calls=1, tool_seconds=elapsed)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        _, tool = self._finish(run_id)
+        self.recorder.increment("errors_total", kind="tool", tool=tool)
+        self._add(errors=1)
+
+    def on_agent_action(self, action: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._add(iterations=1)
+
+    def record_rate_limit_wait(self, provider: str, seconds: float) -> None:
+        """Record time spent waiting for a provider's rate limiter."""
+        self.recorder.observe("rate_limit_wait_seconds", seconds, provider=provider)
+        self._add(rate_limit_wait_seconds=seconds)
+
+    @staticmethod
+    def current() -> Optional["MetricsCallbackHandler"]:
+        """Return the handler of the search running in this context, if any."""
+        return MetricsCallbackHandler._active.get()
+
+    @contextmanager
+    def track(self) -> Iterator["MetricsCallbackHandler"]:
+        """Make this the active handler for the current context."""
+        token = MetricsCallbackHandler._active.set(self)
+        try:
+            yield self
+        finally:
+            MetricsCallbackHandler._active.reset(token)
+
+    def row_metrics(self, rows: int = 1, error: bool = False) -> Dict[str, Any]:
+        """
+        Record the search as finished and return its totals.
+
+        Args:
+            rows: Number of distinct queries the search answered
+            error: Whether the search failed
+
+        Returns:
+            Dict[str, Any]: Latency, call counts, tokens, iterations and waits
+        """
+        elapsed = time.perf_counter() - self.started
+        for _ in range(rows):
+            self.recorder.observe("row_latency_seconds", elapsed)
+        self.recorder.observe("agent_iterations", self.totals["iterations"])
+        self.recorder.increment("searches_total", rows)
+        if error:
+            self.recorder.increment("errors_total", rows, kind="row")
+        with self.lock:
+            metrics = {"latency_seconds": round(elapsed, 6), **self.totals}
+        metrics["llm_seconds"] = round(metrics["llm_seconds"], 6)
+        metrics["tool_seconds"] = round(metrics["tool_seconds"], 6)
+        metrics["rate_limit_wait_seconds"] = round(metrics["rate_limit_wait_seconds"], 6)
+        return metrics
+
+
+def record_rate_limit_wait(provider: str, seconds: float) -> None:
+    """
+    Charge a rate-limit wait to the search running in this context, or to
+    the process-wide recorder when no search is being tracked.
+    """
+    handler = MetricsCallbackHandler.current()
+    if handler is not None:
+        handler.record_rate_limit_wait(provider, seconds)
+    else:
+        MetricsRecorder.shared().observe("rate_limit_wait_seconds", seconds, provider=provider)
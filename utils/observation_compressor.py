@@ -0,0 +1,180 @@
+import math
+import re
+from collections import Counter
+from typing import Any, Callable, List
+
+from config.settings import (
+    OBSERVATION_COMPRESSION,
+    OBSERVATION_MAX_TOKENS,
+    OBSERVATION_PASSAGE_CHARS,
+)
+from utils.metrics import MetricsCallbackHandler, MetricsRecorder
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_WORD = re.compile(r"\w+")
+
+
+class ObservationCompressor:
+    """
+    Shrinks tool output before it reaches the agent's scratchpad.
+
+    Results are split into passages, exact repeats (ignoring case and
+    spacing) are dropped, and if the rest is over the token budget only the
+    passages that score best against the query with BM25 are kept. Kept
+    passages stay in their original order, so each source still reads in
+    sequence.
+    """
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        # About four characters per token, as in SearchAgent
+        return len(text) // 4
+
+    @staticmethod
+    def _split(text: str, source: str = "") -> List[str]:
+        """Split text into passages of about OBSERVATION_PASSAGE_CHARS characters."""
+        prefix = f"[{source}] " if source else ""
+        passages = []
+        for paragraph in str(text).splitlines():
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            current = ""
+            for sentence in _SENTENCE_END.split(paragraph):
+                # Sentences longer than a passage are cut
+                while len(sentence) > OBSERVATION_PASSAGE_CHARS:
+                    if current:
+                        passages.append(prefix + current)
+                        current = ""
+                    passages.append(prefix + sentence[:OBSERVATION_PASSAGE_CHARS])
+                    sentence = sentence[OBSERVATION_PASSAGE_CHARS:]
+                if current and len(current) + 1 + len(sentence) > OBSERVATION_PASSAGE_CHARS:
+                    passages.append(prefix + current)
+                    current = ""
+                current = f"{current} {sentence}" if current else sentence
+            if current:
+                passages.append(prefix + current)
+        return passages
+
+    @staticmethod
+    def passages(result: Any) -> List[str]:
+        """
+        Split a tool result into passages.
+
+        Args:
+            result: Text, a list of strings, or a list of result dicts with
+                'content' (and optionally 'url'), as Tavily returns
+
+        Returns:
+            List[str]: Passages in result order; dict passages are prefixed
+            with their URL
+        """
+        if not isinstance(result, list):
+            return ObservationCompressor._split(result)
+        passages = []
+        for item in result:
+            if isinstance(item, dict):
+                text = item.get("content") or item.get("snippet") or item.get("title") or ""
+                passages += ObservationCompressor._split(text, item.get("url", ""))
+            else:
+                passages += ObservationCompressor._split(item)
+        return passages
+
+    @staticmethod
+    def deduplicate(passages: List[str]) -> List[str]:
+        """Drop passages already seen, ignoring case, spacing and punctuation."""
+        seen = set()
+        unique = []
+        for passage in passages:
+            key = " ".join(_WORD.findall(passage.lower()))
+            if key and key not in seen:
+                seen.add(key)
+                unique.append(passage)
+        return unique
+
+    @staticmethod
+    def bm25_scores(query: str, passages: List[str], k1: float = 1.5, b: float = 0.75) -> List[float]:
+        """
+        Score passages against a query with Okapi BM25.
+
+        Args:
+            query: Search query
+            passages: Passages to score
+            k1: Term frequency saturation
+            b: Length normalization
+
+        Returns:
+            List[float]: One score per passage
+        """
+        terms = set(_WORD.findall(query.lower()))
+        documents = [Counter(_WORD.findall(passage.lower())) for passage in passages]
+        if not terms or not documents:
+            return [0.0] * len(passages)
+
+        average_length = sum(sum(doc.values()) for doc in documents) / len(documents) or 1
+        idf = {}
+        for term in terms:
+            frequency = sum(1 for doc in documents if term in doc)
+            idf[term] = math.log(1 + (len(documents) - frequency + 0.5) / (frequency + 0.5))
+
+        scores = []
+        for doc in documents:
+            length = sum(doc.values())
+            score = 0.0
+            for term in terms:
+                tf = doc.get(term, 0)
+                if tf:
+                    score += idf[term] * tf * (k1 + 1) / (tf + k1 * (1 - b + b * length / average_length))
+            scores.append(score)
+        return scores
+
+    @staticmethod
+    def compress(query: str, result: Any, max_tokens: int = OBSERVATION_MAX_TOKENS) -> Any:
+        """
+        Deduplicate a tool result and fit it to a token budget.
+
+        Args:
+            query: Query the tool was called with
+            result: Raw tool result
+            max_tokens: Token budget of the returned text
+
+        Returns:
+            Any: One passage per line, or the result unchanged if compression
+            is off or it has no text
+        """
+        if not OBSERVATION_COMPRESSION or not result:
+            return result
+
+        passages = ObservationCompressor.deduplicate(ObservationCompressor.passages(result))
+        if not passages:
+            return result
+
+        total = sum(ObservationCompressor._estimate_tokens(passage) for passage in passages)
+        if total > max_tokens:
+            scores = ObservationCompressor.bm25_scores(query, passages)
+            ranked = sorted(range(len(passages)), key=lambda k: scores[k], reverse=True)
+            kept, used = set(), 0
+            for k in ranked:
+                tokens = ObservationCompressor._estimate_tokens(passages[k])
+                if used + tokens <= max_tokens:
+                    kept.add(k)
+                    used += tokens
+            passages = [passage for k, passage in enumerate(passages) if k in kept]
+
+        compressed = "\n".join(passages)
+        ObservationCompressor._record(str(result), compressed)
+        return compressed
+
+    @staticmethod
+    def _record(raw: str, compressed: str) -> None:
+        handler = MetricsCallbackHandler.current()
+        recorder = handler.recorder if handler is not None else MetricsRecorder.shared()
+        recorder.observe("observation_tokens", ObservationCompressor._estimate_tokens(raw), stage="raw")
+        recorder.observe("observation_tokens", ObservationCompressor._estimate_tokens(compressed), stage="compressed")
+
+    @staticmethod
+    def wrap(func: Callable[[str], Any]) -> Callable[[str], Any]:
+        """Return a tool function whose results are compressed against its query."""
+        def compressed(query: str) -> Any:
+            return ObservationCompressor.compress(query, func(query))
+        return compressed
@@ -1,7 +1,9 @@
 import re
+import string
+import numpy as np
 import pandas as pd
 from langchain.prompts import PromptTemplate
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
 
 class QueryGenerator:
     @staticmethod
@@ -9,6 +11,92 @@ class QueryGenerator:
         """Extract placeholders from a given prompt using regex."""
         return re.findall(r"{(.*?)}", prompt)
 
+    @staticmethod
+    def compile_template(query: str) -> Optional[List[Tuple[str, Optional[str]]]]:
+        """
+        Split a template into (literal, placeholder) pairs for column-wise rendering.
+
+        Args:
+            query: Query template with placeholders
+
+        Returns:
+            Optional[List[Tuple[str, Optional[str]]]]: Template parts, or None if the
+            template uses format specs, conversions or attribute/index lookups
+        """
+        parts = []
+        for literal, field, format_spec, conversion in string.Formatter().parse(query):
+            if field is not None and (format_spec or conversion or not field
+                                      or "." in field or "[" in field):
+                return None
+            parts.append((literal, field))
+        return parts
+
+    @staticmethod
+    def _column_as_str(column: pd.Series) -> np.ndarray:
+        """Convert a column to strings the way str.format renders each value."""
+        values = column.astype(str).to_numpy(dtype=object)
+        missing = pd.isna(values)
+        if missing.any():
+            values[missing] = [str(value) for value in column.to_numpy(dtype=object)[missing]]
+        return values
+
+    @staticmethod
+    def report_missing_values(placeholders: List[str], df: pd.DataFrame) -> None:
+        """Print a warning for every row with a missing value in a placeholder column."""
+        for col in dict.fromkeys(placeholders):
+            for index in df.index[df[col].isna()]:
+                print(f"Warning: Missing data for placeholder '{col}' in row {index}")
+
+    @staticmethod
+    def render_queries(query: str, df: pd.DataFrame) -> List[str]:
+        """
+        Render a template for every row by filling placeholders from whole columns.
+
+        Args:
+            query: Query template with placeholders
+            df: DataFrame containing data for placeholders
+
+        Returns:
+            List[str]: One formatted query per row, in row order
+        """
+        parts = QueryGenerator.compile_template(query)
+        if parts is None:
+            return QueryGenerator._render_rowwise(query, df)
+
+        QueryGenerator.report_missing_values(
+            [field for _, field in parts if field is not None], df
+        )
+
+        rendered = np.full(len(df), "", dtype=object)
+        for literal, field in parts:
+            if literal:
+                rendered = rendered + literal
+            if field is not None:
+                rendered = rendered + QueryGenerator._column_as_str(df[field])
+        return rendered.tolist()
+
+    @staticmethod
+    def _render_rowwise(query: str, df: pd.DataFrame) -> List[str]:
+        """
+        Render a template row by row with PromptTemplate. A row that cannot
+        be formatted gets an empty query, so queries stay aligned with rows.
+        """
+        placeholders = QueryGenerator.extract_placeholders(query)
+        prompt_template = PromptTemplate(input_variables=placeholders, template=query)
+
+        formatted_queries = []
+        for _, row in df.iterrows():
+            formatted_query = ""
+            try:
+                formatted_query = prompt_template.format(**row.to_dict())
+            except KeyError as e:
+                print(f"Error: Missing data for placeholder {e} in row {row.to_dict()}")
+            except Exception as e:
+                print(f"Unexpected error formatting query for row {row.to_dict()}: {e}")
+            formatted_queries.append(formatted_query)
+
+        return formatted_queries
+
     @staticmethod
     def generate_queries(query: str, df: pd.DataFrame) -> List[str]:
         """
@@ -22,7 +110,7 @@ class QueryGenerator:
             List[str]: List of formatted queries
         """
         placeholders = QueryGenerator.extract_placeholders(query)
-        
+
         if not placeholders:
             return [query]
 
@@ -33,20 +121,45 @@ class QueryGenerator:
             if missing_columns:
                 raise ValueError(f"Missing columns in DataFrame: {missing_columns}")
 
-            prompt_template = PromptTemplate(input_variables=placeholders, template=query)
-            
-            formatted_queries = []
-            for _, row in df.iterrows():
-                try:
-                    formatted_query = prompt_template.format(**row.to_dict())
-                    formatted_queries.append(formatted_query)
-                except KeyError as e:
-                    print(f"Error: Missing data for placeholder {e} in row {row.to_dict()}")
-                except Exception as e:
-                    print(f"Unexpected error formatting query for row {row.to_dict()}: {e}")
-
-            return formatted_queries
+            return QueryGenerator.render_queries(query, df)
 
         except Exception as e:
             print(f"An unexpected error occurred: {e}")
-            return []
\ No newline at end of file
+            return []
+
+    @staticmethod
+    def iter_queries(
+        query: str,
+        data: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+        chunk_size: int = 1000,
+    ) -> Iterator[List[str]]:
+        """
+        Yield formatted queries in chunks so searching can start before the
+        whole input has been rendered.
+
+        Args:
+            query: Query template with placeholders
+            data: DataFrame, or an iterable of DataFrame chunks
+            chunk_size: Number of rows rendered per chunk when given a DataFrame
+
+        Yields:
+            List[str]: Formatted queries for the next chunk of rows
+        """
+        placeholders = QueryGenerator.extract_placeholders(query)
+
+        if isinstance(data, pd.DataFrame):
+            chunks = (data.iloc[start:start + chunk_size]
+                      for start in range(0, len(data), chunk_size))
+        else:
+            chunks = data
+
+        for chunk in chunks:
+            if not placeholders:
+                yield [query] * len(chunk)
+                continue
+
+            missing_columns = [col for col in placeholders if col not in chunk.columns]
+            if missing_columns:
+                raise ValueError(f"Missing columns in DataFrame: {missing_columns}")
+
+            yield QueryGenerator.render_queries(query, chunk)
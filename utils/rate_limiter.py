@@ -0,0 +1,301 @@
+import threading
+import time
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_core.rate_limiters import BaseRateLimiter
+
+from config.settings import LLM_DEFAULT_RESERVED_TOKENS, PROVIDER_RATE_LIMITS, RATE_LIMIT_SHARE
+from utils.metrics import record_rate_limit_wait
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at a per-minute rate."""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """
+        Block until ``amount`` tokens are available and take them.
+
+        Args:
+            amount: Number of tokens to take (clamped to the bucket capacity)
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                delay = (amount - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def debit(self, amount: float) -> None:
+        """Take tokens without waiting; the balance may go negative. A negative amount returns tokens."""
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens - amount)
+
+
+class ProviderRateLimiter:
+    """Requests-per-minute and tokens-per-minute buckets for one provider."""
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        provider: str = "",
+    ):
+        self.provider = provider
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.lock = threading.Lock()
+        self.total_wait = 0.0
+        # Running average of tokens per LLM call, and each thread's open reservations
+        self.average_tokens: Optional[float] = None
+        self._reserved = threading.local()
+
+    def acquire(self, tokens: float = 0) -> float:
+        """
+        Wait for a request slot and, if a token budget is set, for ``tokens``.
+
+        Args:
+            tokens: Estimated number of tokens the request will consume
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        waited = 0.0
+        if self.requests is not None:
+            waited += self.requests.acquire(1)
+        if self.tokens is not None and tokens:
+            waited += self.tokens.acquire(tokens)
+        self._record_wait(waited)
+        return waited
+
+    def reserve_tokens(self) -> float:
+        """
+        Wait for and take the expected token cost of an LLM call before it is sent.
+
+        The reservation is the recent average tokens per call, or
+        LLM_DEFAULT_RESERVED_TOKENS before any usage was reported. It is
+        remembered for the calling thread until ``settle_tokens``.
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        if self.tokens is None:
+            return 0.0
+        amount = self.average_tokens or LLM_DEFAULT_RESERVED_TOKENS
+        waited = self.tokens.acquire(amount)
+        self._pending().append(amount)
+        self._record_wait(waited)
+        return waited
+
+    def settle_tokens(self, used: Optional[float]) -> None:
+        """
+        Charge the tokens a call used against its reservation.
+
+        Args:
+            used: Tokens the call consumed; None keeps the reservation as the charge
+        """
+        if self.tokens is None:
+            return
+        pending = self._pending()
+        reserved = pending.pop(0) if pending else 0.0
+        if used is None:
+            return
+        self.tokens.debit(used - reserved)
+        with self.lock:
+            # Weighted toward recent calls, as prompts grow with the scratchpad
+            self.average_tokens = used if self.average_tokens is None else 0.8 * self.average_tokens + 0.2 * used
+
+    def _pending(self) -> List[float]:
+        if not hasattr(self._reserved, "amounts"):
+            self._reserved.amounts = []
+        return self._reserved.amounts
+
+    def _record_wait(self, waited: float) -> None:
+        with self.lock:
+            self.total_wait += waited
+        if waited:
+            record_rate_limit_wait(self.provider, waited)
+
+
+class RateLimiter:
+    """Process-wide registry of provider rate limiters."""
+
+    _limiters: Dict[str, ProviderRateLimiter] = {}
+    _lock = threading.Lock()
+    _share = RATE_LIMIT_SHARE
+
+    @staticmethod
+    def set_share(share: float) -> None:
+        """
+        Let this process use only a fraction of every provider's limits.
+
+        Worker processes that share API keys should each take 1/N of the
+        limits so that together they stay within them. Limiters created
+        before the call are rebuilt on next use.
+
+        Args:
+            share: Fraction of PROVIDER_RATE_LIMITS, in (0, 1]
+        """
+        if not 0 < share <= 1:
+            raise ValueError("share must be in (0, 1]")
+        with RateLimiter._lock:
+            RateLimiter._share = share
+            RateLimiter._limiters = {}
+
+    @staticmethod
+    def get(provider: str) -> ProviderRateLimiter:
+        """
+        Return the shared limiter for a provider, creating it on first use.
+
+        Args:
+            provider: Provider key, e.g. 'groq' or 'tavily'
+
+        Returns:
+            ProviderRateLimiter: Limiter configured from PROVIDER_RATE_LIMITS,
+            scaled by this process's share
+        """
+        with RateLimiter._lock:
+            limiter = RateLimiter._limiters.get(provider)
+            if limiter is None:
+                limits = {
+                    name: value * RateLimiter._share
+                    for name, value in PROVIDER_RATE_LIMITS.get(provider, {}).items()
+                }
+                limiter = ProviderRateLimiter(**limits, provider=provider)
+                RateLimiter._limiters[provider] = limiter
+            return limiter
+
+    @staticmethod
+    def wrap(provider: str, func: Callable) -> Callable:
+        """
+        Wrap a tool function so every call takes a request slot first.
+
+        Args:
+            provider: Provider key the call is charged to
+            func: Function to wrap
+
+        Returns:
+            Callable: Rate-limited function
+        """
+        @wraps(func)
+        def limited(*args, **kwargs):
+            RateLimiter.get(provider).acquire()
+            return func(*args, **kwargs)
+
+        return limited
+
+
+class LLMRateLimiter(BaseRateLimiter):
+    """
+    Chat model rate limiter backed by a provider's shared limiter.
+
+    LangChain calls it only when a request actually goes to the provider, so
+    responses served from the LLM cache never wait. Each request reserves its
+    expected token cost here, so concurrent requests cannot all start on the
+    same budget; ``RateLimitCallbackHandler`` settles the reservation against
+    the reported usage when the call ends.
+    """
+
+    def __init__(self, provider: str):
+        self.provider = provider
+
+    def acquire(self, *, blocking: bool = True) -> bool:
+        limiter = RateLimiter.get(self.provider)
+        if not blocking:
+            return True
+        limiter.acquire()
+        limiter.reserve_tokens()
+        return True
+
+    async def aacquire(self, *, blocking: bool = True) -> bool:
+        return self.acquire(blocking=blocking)
+
+
+class RateLimitCallbackHandler(BaseCallbackHandler):
+    """
+    Callback that settles LLM token reservations on a provider's shared limiter.
+
+    When a call ends, the usage reported by the provider replaces the tokens
+    ``LLMRateLimiter`` reserved for it; if none is reported, the prompt size
+    (about four characters per token) is used instead. Cached responses were
+    never reserved and are not charged. A failed call keeps its reservation.
+    """
+
+    def __init__(self, provider: str):
+        self.provider = provider
+        self._estimates: Dict[UUID, int] = {}
+
+    @staticmethod
+    def _estimate_tokens(texts: List[str]) -> int:
+        return sum(len(text) for text in texts) // 4
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], *, run_id: UUID, **kwargs: Any) -> None:
+        self._estimates[run_id] = self._estimate_tokens(prompts)
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[Any]], *, run_id: UUID, **kwargs: Any) -> None:
+        self._estimates[run_id] = self._estimate_tokens(
+            [str(message.content) for batch in messages for message in batch]
+        )
+
+    @staticmethod
+    def token_usage(response: LLMResult) -> Tuple[bool, Optional[int]]:
+        """
+        Read the token usage reported for a call.
+
+        Args:
+            response: Result passed to ``on_llm_end``
+
+        Returns:
+            Tuple[bool, Optional[int]]: Whether the response came from the LLM
+            cache, and the total tokens reported (None if not reported)
+        """
+        usages = [
+            generation.message.usage_metadata or {}
+            for generations in response.generations
+            for generation in generations
+            if getattr(generation, "message", None) is not None
+        ]
+        # LangChain marks generations served from the LLM cache with a zero cost
+        if usages and all("total_cost" in usage for usage in usages):
+            return True, None
+
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        total = usage.get("total_tokens")
+        if total is None and usages:
+            # Providers such as Gemini report usage on the message instead
+            total = sum(message_usage.get("total_tokens", 0) for message_usage in usages) or None
+        return False, total
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        estimate = self._estimates.pop(run_id, 0)
+        cached, total = RateLimitCallbackHandler.token_usage(response)
+        if not cached:
+            RateLimiter.get(self.provider).settle_tokens(total or estimate)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._estimates.pop(run_id, None)
+        RateLimiter.get(self.provider).settle_tokens(None)
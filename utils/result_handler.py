@@ -1,5 +1,183 @@
+import json
+import os
 import pandas as pd
-from typing import List, Dict, Any
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+ROW_INDEX_COLUMN = "_row"
+
+# Result projections: final answers only, or answers with the agent trace
+RESULT_VIEWS = ("answers", "trace")
+
+
+class ResultSink:
+    """
+    Incremental writer for result rows.
+
+    Rows may arrive in any order; each one carries its input row index in the
+    ``_row`` column so the final frame can be put back in input order.
+    """
+
+    def __init__(self, path: str, chunk_size: int = 500):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.buffer: List[Dict[str, Any]] = []
+        self.rows_written = 0
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def write(self, row_index: int, row: Dict[str, Any]) -> None:
+        """
+        Add a result row, flushing to disk once ``chunk_size`` rows are buffered.
+
+        Args:
+            row_index: 0-based index of the row in the input
+            row: Column values for the row
+        """
+        self.buffer.append({ROW_INDEX_COLUMN: row_index, **row})
+        if len(self.buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered rows to disk."""
+        if self.buffer:
+            self._write_chunk(self.buffer)
+            self.rows_written += len(self.buffer)
+            self.buffer = []
+
+    def _write_chunk(self, rows: List[Dict[str, Any]]) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Flush remaining rows and close the output, creating it if no row was written."""
+        self.flush()
+        if self.rows_written == 0 and not os.path.exists(self.path):
+            self._write_empty()
+
+    def _write_empty(self) -> None:
+        raise NotImplementedError
+
+    def read(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Read the rows written so far, in input row order.
+
+        Args:
+            columns: Columns to read besides the row index (all if None)
+
+        Returns:
+            pd.DataFrame: Rows sorted by input row index
+        """
+        if self.rows_written == 0 or not os.path.exists(self.path):
+            return pd.DataFrame(columns=[ROW_INDEX_COLUMN] + (columns or []))
+        df = self._read(None if columns is None else [ROW_INDEX_COLUMN] + columns)
+        return df.sort_values(ROW_INDEX_COLUMN, kind="stable").reset_index(drop=True)
+
+    def _read(self, columns: Optional[List[str]]) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def __enter__(self) -> "ResultSink":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class JSONLResultSink(ResultSink):
+    """Writes one JSON object per row; readable while the run is in progress."""
+
+    def __init__(self, path: str, chunk_size: int = 1):
+        super().__init__(path, chunk_size)
+
+    def _write_chunk(self, rows: List[Dict[str, Any]]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row, default=str) + "\n")
+
+    def _write_empty(self) -> None:
+        open(self.path, "w", encoding="utf-8").close()
+
+    def _read(self, columns: Optional[List[str]]) -> pd.DataFrame:
+        df = pd.read_json(self.path, lines=True, dtype=False)
+        return df if columns is None else df[columns]
+
+
+class CSVResultSink(ResultSink):
+    """Appends rows to a CSV file in chunks; readable while the run is in progress."""
+
+    def __init__(self, path: str, chunk_size: int = 100):
+        super().__init__(path, chunk_size)
+        self.columns: Optional[List[str]] = None
+
+    def _write_chunk(self, rows: List[Dict[str, Any]]) -> None:
+        header = self.columns is None
+        if header:
+            self.columns = list(rows[0].keys())
+        pd.DataFrame(rows, columns=self.columns).to_csv(
+            self.path, mode="a", header=header, index=False
+        )
+
+    def _write_empty(self) -> None:
+        pd.DataFrame(columns=[ROW_INDEX_COLUMN]).to_csv(self.path, index=False)
+
+    def _read(self, columns: Optional[List[str]]) -> pd.DataFrame:
+        # Keep the written text as-is instead of re-inferring dtypes
+        dtype = None if columns is None else {col: str for col in columns if col != ROW_INDEX_COLUMN}
+        return pd.read_csv(self.path, usecols=columns, dtype=dtype)
+
+
+class ParquetResultSink(ResultSink):
+    """
+    Writes each chunk as a Parquet row group. All values are stored as
+    strings so every row group shares one schema. The file footer is written
+    on close, so the file is only readable once the sink is closed.
+    """
+
+    def __init__(self, path: str, chunk_size: int = 1000):
+        super().__init__(path, chunk_size)
+        self.writer = None
+        self.schema = None
+
+    def _write_chunk(self, rows: List[Dict[str, Any]]) -> None:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet output requires pyarrow. Install it with `pip install pyarrow`.")
+
+        if self.writer is None:
+            fields = [pa.field(ROW_INDEX_COLUMN, pa.int64())]
+            fields += [pa.field(str(name), pa.string()) for name in rows[0] if name != ROW_INDEX_COLUMN]
+            self.schema = pa.schema(fields)
+            self.writer = pq.ParquetWriter(self.path, self.schema)
+
+        columns = {
+            field.name: [
+                row.get(field.name) if field.name == ROW_INDEX_COLUMN or row.get(field.name) is None
+                else str(row.get(field.name))
+                for row in rows
+            ]
+            for field in self.schema
+        }
+        self.writer.write_table(pa.Table.from_pydict(columns, schema=self.schema))
+
+    def close(self) -> None:
+        super().close()
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    def _write_empty(self) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        # No row gave the column names, so the file only has the row index
+        schema = pa.schema([pa.field(ROW_INDEX_COLUMN, pa.int64())])
+        pq.write_table(schema.empty_table(), self.path)
+
+    def _read(self, columns: Optional[List[str]]) -> pd.DataFrame:
+        return pd.read_parquet(self.path, columns=columns)
+
 
 class ResultHandler:
     @staticmethod
@@ -16,7 +194,71 @@ class ResultHandler:
         if isinstance(response, dict) and 'output' in response:
             return response['output']
         return str(response)
+
+    @staticmethod
+    def serialize_result(response: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convert an agent response into plain JSON-compatible data.
+
+        Args:
+            response: Raw response from the agent
+
+        Returns:
+            Dict[str, Any]: Response with intermediate steps as plain dicts
+        """
+        if not isinstance(response, dict):
+            return {"output": str(response)}
+
+        serialized = dict(response)
+        steps = []
+        for step in response.get("intermediate_steps", []):
+            if isinstance(step, dict):
+                steps.append(step)
+                continue
+            action, observation = step
+            steps.append({
+                "tool": getattr(action, "tool", None),
+                "tool_input": getattr(action, "tool_input", None),
+                "log": getattr(action, "log", None),
+                "observation": observation,
+            })
+        if "intermediate_steps" in response:
+            serialized["intermediate_steps"] = steps
+        return serialized
     
+    @staticmethod
+    def project_row(row: Dict[str, Any], view: str = "trace") -> Dict[str, Any]:
+        """
+        Project a finished job row for an API response.
+
+        Args:
+            row: Row as read from the job, with the serialized 'result' if traced
+            view: 'answers' drops the result and its intermediate steps;
+                'trace' returns the row unchanged
+
+        Returns:
+            Dict[str, Any]: Projected row
+        """
+        if view not in RESULT_VIEWS:
+            raise ValueError(f"view must be one of {RESULT_VIEWS}")
+        if view == "answers":
+            return {key: value for key, value in row.items() if key != "result"}
+        return row
+
+    @staticmethod
+    def to_columns(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Lay rows out as column names plus value lists, so keys are sent once.
+
+        Args:
+            rows: Rows as dicts
+
+        Returns:
+            Dict[str, Any]: 'columns' and one 'data' list per row
+        """
+        columns = list(dict.fromkeys(key for row in rows for key in row))
+        return {"columns": columns, "data": [[row.get(column) for column in columns] for row in rows]}
+
     @staticmethod
     def create_results_dataframe(
         original_df: pd.DataFrame,
@@ -67,4 +309,74 @@ class ResultHandler:
         elif format.lower() == 'excel':
             df.to_excel(output_path, index=False)
         else:
-            raise ValueError("Unsupported format. Use 'csv' or 'excel'")
\ No newline at end of file
+            raise ValueError("Unsupported format. Use 'csv' or 'excel'")
+
+    @staticmethod
+    def open_sink(output_path: str, format: Optional[str] = None, chunk_size: Optional[int] = None) -> ResultSink:
+        """
+        Open a streaming sink that writes result rows as they complete.
+
+        Args:
+            output_path: Path of the output file
+            format: 'jsonl', 'csv' or 'parquet'; inferred from the extension if None
+            chunk_size: Rows buffered before each write (format default if None)
+
+        Returns:
+            ResultSink: Open sink
+        """
+        format = (format or Path(output_path).suffix.lstrip(".") or "csv").lower()
+        sinks = {"jsonl": JSONLResultSink, "csv": CSVResultSink, "parquet": ParquetResultSink}
+        if format not in sinks:
+            raise ValueError("Unsupported format. Use 'jsonl', 'csv' or 'parquet'")
+        kwargs = {} if chunk_size is None else {"chunk_size": chunk_size}
+        return sinks[format](output_path, **kwargs)
+
+    @staticmethod
+    def create_sink_row(
+        original_row: Dict[str, Any],
+        query: str,
+        result: Dict[str, Any],
+        result_column_name: str = "search_result"
+    ) -> Dict[str, Any]:
+        """
+        Build one output row the way create_results_dataframe lays it out.
+
+        Args:
+            original_row: Column values of the input row
+            query: Query executed for the row
+            result: Search result from the agent
+            result_column_name: Name for the column containing search results
+
+        Returns:
+            Dict[str, Any]: Output row
+        """
+        return {
+            **original_row,
+            "generated_query": query,
+            result_column_name: ResultHandler.process_agent_response(result),
+        }
+
+    @staticmethod
+    def assemble_from_sink(
+        original_df: pd.DataFrame,
+        sink: ResultSink,
+        result_column_name: str = "search_result"
+    ) -> pd.DataFrame:
+        """
+        Build the final results DataFrame from a closed sink.
+
+        Only the query and result columns are read back; they are joined onto
+        the original frame without copying it first.
+
+        Args:
+            original_df: Original input DataFrame
+            sink: Sink the rows were written to
+            result_column_name: Name of the column containing search results
+
+        Returns:
+            pd.DataFrame: Combined DataFrame with original data and results
+        """
+        added = sink.read(["generated_query", result_column_name])
+        added = added.set_index(ROW_INDEX_COLUMN).reindex(range(len(original_df)))
+        added.index = original_df.index
+        return pd.concat([original_df, added], axis=1)
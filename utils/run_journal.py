@@ -0,0 +1,111 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict
+
+from utils.result_handler import ResultHandler
+
+
+class RunJournal:
+    """
+    Append-only JSONL record of finished rows, used to resume a crashed run.
+
+    Each line holds the row index, a hash of the row's rendered query and the
+    serialized agent result. Lines are flushed and synced as they are written,
+    so at most the row being written when a crash happens is lost.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = None
+
+    @staticmethod
+    def query_hash(query: str) -> str:
+        """Return a short, stable hash of a rendered query."""
+        return hashlib.sha256(query.encode("utf-8")).hexdigest()[:16]
+
+    def load(self) -> Dict[int, Dict[str, Any]]:
+        """
+        Read finished rows from the journal.
+
+        Returns:
+            Dict[int, Dict[str, Any]]: Journal records keyed by row index
+        """
+        records = {}
+        if not os.path.exists(self.path):
+            return records
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash can leave the last line half written
+                    continue
+                records[record["row"]] = record
+        return records
+
+    def open(self, resume: bool = False) -> "RunJournal":
+        """
+        Open the journal for writing.
+
+        Args:
+            resume: Keep existing records instead of starting a new journal
+        """
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        if resume and os.path.exists(self.path):
+            RunJournal._drop_partial_line(self.path)
+        self.file = open(self.path, "a" if resume else "w", encoding="utf-8")
+        return self
+
+    @staticmethod
+    def _drop_partial_line(path: str) -> None:
+        """Truncate a half-written last line, so new records start on a line of their own."""
+        with open(path, "rb+") as f:
+            end = f.seek(0, os.SEEK_END)
+            position = end
+            while position > 0:
+                start = max(0, position - 4096)
+                f.seek(start)
+                newline = f.read(position - start).rfind(b"\n")
+                if newline != -1:
+                    position = start + newline + 1
+                    break
+                position = start
+            if position < end:
+                f.truncate(position)
+
+    def append(self, row: int, query: str, result: Dict[str, Any]) -> None:
+        """
+        Record a finished row.
+
+        Args:
+            row: 0-based row index in the input
+            query: Rendered query for the row
+            result: Agent result for the row
+        """
+        record = {
+            "row": row,
+            "query_hash": RunJournal.query_hash(query),
+            "result": ResultHandler.serialize_result(result),
+        }
+        line = json.dumps(record, default=str) + "\n"
+        with self.lock:
+            self.file.write(line)
+            self.file.flush()
+            os.fsync(self.file.fileno())
+
+    def close(self) -> None:
+        """Close the journal file."""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self) -> "RunJournal":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,195 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import pandas as pd
+
+from config.settings import (
+    UPLOAD_CACHE_DIR,
+    UPLOAD_CHUNK_SIZE,
+    UPLOAD_CONVERT_CHUNK_ROWS,
+    UPLOAD_SCHEMA_SAMPLE_ROWS,
+)
+
+
+class UploadStore:
+    """
+    Ingests uploaded CSV files and serves them back as DataFrames.
+
+    Uploads are written to disk in chunks while they are hashed. Each distinct
+    content is converted once, chunk by chunk, to a Parquet file in
+    UPLOAD_CACHE_DIR named after its SHA-256, so later runs read only the
+    columns and rows they need instead of parsing the CSV again. Values are
+    stored as the text found in the CSV, so every chunk shares one schema.
+
+    A small JSON record next to the Parquet files maps each upload to its
+    hash, schema and row count; it is rebuilt if the CSV changes on disk.
+    """
+
+    @staticmethod
+    async def save(upload, path: Union[str, Path]) -> Dict[str, Any]:
+        """
+        Stream an upload to disk without holding it in memory.
+
+        Args:
+            upload: Object with an async ``read(size)``, e.g. FastAPI's UploadFile
+            path: Destination path
+
+        Returns:
+            Dict[str, Any]: 'sha256' of the content and its 'size' in bytes
+        """
+        path = Path(path)
+        partial = path.with_name(path.name + ".part")
+        digest = hashlib.sha256()
+        size = 0
+        with open(partial, "wb") as buffer:
+            while True:
+                chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                buffer.write(chunk)
+                size += len(chunk)
+        os.replace(partial, path)
+        return {"sha256": digest.hexdigest(), "size": size}
+
+    @staticmethod
+    def hash_file(path: Union[str, Path]) -> str:
+        """Return the SHA-256 of a file, read in chunks."""
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def detect_schema(path: Union[str, Path], sample_rows: int = UPLOAD_SCHEMA_SAMPLE_ROWS) -> Dict[str, Any]:
+        """
+        Detect the columns and their types from the first rows of a CSV.
+
+        Args:
+            path: CSV file
+            sample_rows: Number of rows parsed
+
+        Returns:
+            Dict[str, Any]: 'columns' in file order and inferred 'dtypes'
+        """
+        sample = pd.read_csv(path, nrows=sample_rows)
+        return {
+            "columns": sample.columns.tolist(),
+            "dtypes": {column: str(dtype) for column, dtype in sample.dtypes.items()},
+        }
+
+    @staticmethod
+    def _record_path(path: Path) -> Path:
+        return Path(UPLOAD_CACHE_DIR) / f"{path.name}.json"
+
+    @staticmethod
+    def parquet_path(sha256: str) -> Path:
+        """Return the cached Parquet path for a content hash."""
+        return Path(UPLOAD_CACHE_DIR) / f"{sha256}.parquet"
+
+    @staticmethod
+    def _convert(path: Path, target: Path, columns: List[str]) -> int:
+        """Convert a CSV to Parquet one chunk at a time, returning the row count."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema([pa.field(str(column), pa.string()) for column in columns])
+        partial = target.with_name(target.name + ".part")
+        rows = 0
+        with pq.ParquetWriter(partial, schema) as writer:
+            for chunk in pd.read_csv(path, dtype=str, chunksize=UPLOAD_CONVERT_CHUNK_ROWS):
+                chunk.columns = [str(column) for column in chunk.columns]
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+                rows += len(chunk)
+        os.replace(partial, target)
+        return rows
+
+    @staticmethod
+    def ingest(path: Union[str, Path], sha256: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Record an uploaded CSV and convert it to the Parquet cache if needed.
+
+        Args:
+            path: CSV file
+            sha256: Content hash if already known, e.g. from ``save``
+
+        Returns:
+            Dict[str, Any]: 'sha256', 'columns', 'dtypes' and 'row_count'
+        """
+        path = Path(path)
+        stat = path.stat()
+        record_path = UploadStore._record_path(path)
+        if record_path.exists():
+            record = json.loads(record_path.read_text())
+            if (record["size"] == stat.st_size and record["mtime_ns"] == stat.st_mtime_ns
+                    and UploadStore.parquet_path(record["sha256"]).exists()):
+                return record
+
+        sha256 = sha256 or UploadStore.hash_file(path)
+        schema = UploadStore.detect_schema(path)
+        target = UploadStore.parquet_path(sha256)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if target.exists():
+            import pyarrow.parquet as pq
+            row_count = pq.ParquetFile(target).metadata.num_rows
+        else:
+            row_count = UploadStore._convert(path, target, schema["columns"])
+
+        record = {
+            "sha256": sha256,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "row_count": row_count,
+            **schema,
+        }
+        record_path.write_text(json.dumps(record))
+        return record
+
+    @staticmethod
+    def load(
+        path: Union[str, Path],
+        columns: Optional[List[str]] = None,
+        num_rows: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """
+        Load an uploaded CSV from the Parquet cache, ingesting it first if needed.
+
+        Args:
+            path: CSV file
+            columns: Columns to read (all if None)
+            num_rows: Read only the first rows (all if None)
+
+        Returns:
+            pd.DataFrame: The requested columns and rows, as text
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        record = UploadStore.ingest(path)
+        if columns is not None:
+            missing = [column for column in columns if column not in record["columns"]]
+            if missing:
+                raise ValueError(f"Missing required columns: {missing}")
+
+        parquet = pq.ParquetFile(UploadStore.parquet_path(record["sha256"]))
+        schema = parquet.schema_arrow
+        if columns is not None:
+            schema = pa.schema([schema.field(column) for column in columns])
+        if num_rows is None:
+            table = parquet.read(columns=columns)
+        else:
+            batches = []
+            remaining = num_rows
+            for batch in parquet.iter_batches(batch_size=min(max(num_rows, 1), 65536), columns=columns):
+                batches.append(batch.slice(0, remaining))
+                remaining -= len(batches[-1])
+                if remaining <= 0:
+                    break
+            table = pa.Table.from_batches(batches, schema=schema)
+        df = table.to_pandas()
+        # Missing values come back as None in object columns; use NaN like read_csv
+        return df.mask(df.isna())